@@ -0,0 +1,244 @@
+#
+# Copyright (c) 2023 Airbyte, Inc., all rights reserved.
+#
+
+"""
+Offline throughput benchmark for SourceLinkedinJobScrapper.read.
+
+Runs read() against the local stand-in servers in stub_server.py and reports jobs per second, per-stage latency
+percentiles and peak RSS. Each scenario runs in its own process so peak RSS is not shared between them.
+
+    python benchmarks/run.py                      # every scenario
+    python benchmarks/run.py --scenario baseline --max-workers 16
+    python benchmarks/run.py --output bench_output.txt
+"""
+
+import argparse
+import importlib.util
+import inspect
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_server import StubSettings, start_stub_server
+
+SOURCE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "try.py")
+STAGES = ["discovery", "fetch", "parse", "enrich", "emit"]
+
+scenarios = {
+    "baseline": {
+        "roles": ["Data Analyst"],
+        "stub": {"jobs_per_query": 200, "page_latency": 0.05, "llm_latency": 0.3},
+    },
+    "overlapping_roles": {
+        "roles": ["Data Analyst", "Business Analyst", "MIS Analyst", "Python Developer", "SQL Developer", "Power BI Developer"],
+        "stub": {"jobs_per_query": 100, "overlap": 0.6, "page_latency": 0.05, "llm_latency": 0.3},
+    },
+    # the built-in role list, read at once so the roles can be planned into combined searches
+    "role_variants": {
+        "roles": ["dummy"],
+        "stub": {"jobs_per_query": 10, "page_latency": 0.05, "llm_latency": 0.1},
+    },
+    "search_matrix": {
+        "roles": ["Data Analyst"],
+        "stub": {"jobs_per_query": 100, "overlap": 0.3, "page_latency": 0.05, "llm_latency": 0.1},
+        "config": {"search_matrix": {"location": ["India", "United States", "Germany"], "job_level": ["entry_level", "associate"]}},
+    },
+    "throttled_llm": {
+        "roles": ["Data Analyst"],
+        "stub": {"jobs_per_query": 100, "page_latency": 0.05, "llm_latency": 0.3, "llm_error_rate": 0.1},
+    },
+    "malformed_llm": {
+        "roles": ["Data Analyst"],
+        "stub": {"jobs_per_query": 100, "page_latency": 0.05, "llm_latency": 0.3, "llm_malformed_rate": 0.2},
+    },
+    "slow_pages": {
+        "roles": ["Data Analyst"],
+        "stub": {"jobs_per_query": 100, "page_latency": 0.5, "llm_latency": 0.1, "page_error_rate": 0.02},
+    },
+    "blocked_pages": {
+        "roles": ["Data Analyst"],
+        "stub": {"jobs_per_query": 100, "page_latency": 0.05, "llm_latency": 0.1, "page_error_rate": 0.05, "captcha_rate": 0.05},
+    },
+}
+
+
+def load_source_module():
+    spec = importlib.util.spec_from_file_location("source_linkedin_job_scrapper", SOURCE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class StageTimer:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {stage: [] for stage in STAGES}
+
+    def record(self, stage, started_at):
+        elapsed = time.perf_counter() - started_at
+        with self.lock:
+            self.samples[stage].append(elapsed)
+
+    def drain(self, stage, generator, started_at):
+        try:
+            yield from generator
+        finally:
+            self.record(stage, started_at)
+
+    def wrap(self, stage, function):
+        def timed(*args, **kwargs):
+            started_at = time.perf_counter()
+            try:
+                result = function(*args, **kwargs)
+            except BaseException:
+                self.record(stage, started_at)
+                raise
+            # streaming stages are timed until their generator is exhausted
+            if inspect.isgenerator(result):
+                return self.drain(stage, result, started_at)
+            self.record(stage, started_at)
+            return result
+        return timed
+
+    @staticmethod
+    def percentile(samples, fraction):
+        if not samples:
+            return 0.0
+        ordered = sorted(samples)
+        return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+    def summary(self):
+        return {
+            stage: {
+                "count": len(samples),
+                "p50_ms": round(self.percentile(samples, 0.5) * 1000, 2),
+                "p90_ms": round(self.percentile(samples, 0.9) * 1000, 2),
+                "p99_ms": round(self.percentile(samples, 0.99) * 1000, 2),
+                "total_s": round(sum(samples), 3),
+            }
+            for stage, samples in self.samples.items()
+        }
+
+
+@contextmanager
+def instrumented(module, timer):
+    """
+    Wraps the stage entry points on the classes so instances created inside read() are timed too.
+    """
+    source_class = module.SourceLinkedinJobScrapper
+    patches = [
+        (source_class, "get_all_jobs_jd_links", "discovery", False),
+        (source_class, "fetch_page", "fetch", False),
+        (module.JobPageParser, "parse_job_page", "parse", False),
+        (source_class, "extract_additional_details_from_job_text", "enrich", False),
+        (module.RecordEmitter, "emit", "emit", False),
+    ]
+    originals = []
+    for owner, name, stage, is_static in patches:
+        original = owner.__dict__[name]
+        originals.append((owner, name, original))
+        function = original.__func__ if is_static else original
+        wrapped = timer.wrap(stage, function)
+        setattr(owner, name, staticmethod(wrapped) if is_static else wrapped)
+    try:
+        yield
+    finally:
+        for owner, name, original in originals:
+            setattr(owner, name, original)
+
+
+def run_scenario(name, max_workers, extra_config):
+    scenario = scenarios[name]
+    server, base_url = start_stub_server(StubSettings(**scenario["stub"]))
+    module = load_source_module()
+    logging.disable(logging.CRITICAL)
+    timer = StageTimer()
+    jobs = 0
+    records = 0
+    started_at = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="linkedin-bench-") as work_dir, instrumented(module, timer):
+        for role in scenario["roles"]:
+            # roles run as separate reads, so the job index is persisted to dedup postings across them like one sync would
+            config = {
+                "job_role": role,
+                "open_ai_api_key": "bench",
+                "linkedin_base_url": base_url,
+                "openai_base_url": base_url,
+                "discovery_mode": "http",
+                "max_workers": max_workers,
+                "job_index_path": os.path.join(work_dir, "job_index.json"),
+                "openai_requests_per_minute": 100000,
+                "openai_tokens_per_minute": 100000000,
+            } | scenario.get("config", {}) | extra_config
+            source = module.SourceLinkedinJobScrapper()
+            for message in source.read(logging.getLogger("bench"), config, None, {}):
+                if message.type == module.Type.RECORD:
+                    records += 1
+                    if message.record.stream == "job_openings":
+                        jobs += 1
+    elapsed = time.perf_counter() - started_at
+    server.shutdown()
+    return {
+        "scenario": name,
+        "max_workers": max_workers,
+        "jobs": jobs,
+        "records": records,
+        "elapsed_s": round(elapsed, 3),
+        "jobs_per_s": round(jobs / elapsed, 2) if elapsed else 0.0,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "upstream_requests": dict(server.stub_state.counts),
+        "stages": timer.summary(),
+    }
+
+
+def print_result(result):
+    print(f"\n{result['scenario']}: {result['jobs']} jobs in {result['elapsed_s']}s = {result['jobs_per_s']} jobs/s, "
+          f"peak RSS {result['peak_rss_mb']} MB, upstream {result['upstream_requests']}")
+    print(f"  {'stage':<10}{'count':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'total s':>10}")
+    for stage, stats in result["stages"].items():
+        print(f"  {stage:<10}{stats['count']:>8}{stats['p50_ms']:>10}{stats['p90_ms']:>10}{stats['p99_ms']:>10}{stats['total_s']:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", choices=sorted(scenarios) + ["all"], default="all")
+    parser.add_argument("--max-workers", type=int, default=8)
+    parser.add_argument("--config", default="{}", help="extra source config as JSON, merged over the scenario config")
+    parser.add_argument("--output", help="append one JSON line per scenario to this file")
+    parser.add_argument("--json", action="store_true", help="print the raw result as JSON (used for the per-scenario processes)")
+    args = parser.parse_args()
+
+    if args.scenario != "all":
+        result = run_scenario(args.scenario, args.max_workers, json.loads(args.config))
+        results = [result]
+        if args.json:
+            print(json.dumps(result))
+            return
+    else:
+        results = []
+        for name in scenarios:
+            output = subprocess.run([sys.executable, os.path.abspath(__file__), "--scenario", name, "--max-workers", str(args.max_workers),
+                                     "--config", args.config, "--json"], check=True, capture_output=True, text=True).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+
+    for result in results:
+        print_result(result)
+    if args.output:
+        with open(args.output, "a") as f:
+            for result in results:
+                f.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
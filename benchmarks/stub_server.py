@@ -0,0 +1,258 @@
+#
+# Copyright (c) 2023 Airbyte, Inc., all rights reserved.
+#
+
+
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from string import Template
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+GUEST_SEARCH_PATH = "/jobs-guest/jobs/api/seeMoreJobPostings/search"
+JOB_VIEW_PREFIX = "/jobs/view/"
+CHAT_COMPLETIONS_PATH = "/v1/chat/completions"
+SEARCH_PAGE_SIZE = 25
+SHARED_JOB_ID_BASE = 4000000000
+SIMILAR_JOBS_PER_PAGE = 24
+OR_TERM_PATTERN = re.compile(r'"([^"]+)"')
+CAPTCHA_PAGE = '<html><body><form id="captcha-internal"><div class="g-recaptcha"></div></form></body></html>'
+
+companies = ["Acme Analytics", "Globex Payments", "Initech Services", "Umbrella Data", "Hooli Cloud", "Stark Digital"]
+recruiters = ["Priya Sharma", "Rahul Mehta", "Ananya Iyer", "", ""]
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name)) as f:
+        return f.read()
+
+
+class StubSettings:
+    """
+    Knobs for the stand-in servers. Latencies are in seconds; error rates are the share of requests answered with a
+    429 instead of the fixture, captcha_rate the share of job pages answered with a 200 CAPTCHA page and
+    llm_malformed_rate the share of first extraction replies cut off mid-JSON.
+    """
+
+    def __init__(self, jobs_per_query=100, overlap=0.0, page_latency=0.0, llm_latency=0.0, page_error_rate=0.0,
+                 llm_error_rate=0.0, captcha_rate=0.0, llm_malformed_rate=0.0, seed=0):
+        self.jobs_per_query = jobs_per_query
+        self.overlap = overlap
+        self.page_latency = page_latency
+        self.llm_latency = llm_latency
+        self.page_error_rate = page_error_rate
+        self.llm_error_rate = llm_error_rate
+        self.captcha_rate = captcha_rate
+        self.llm_malformed_rate = llm_malformed_rate
+        self.seed = seed
+
+
+class StubState:
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.random = random.Random(settings.seed)
+        self.lock = threading.Lock()
+        self.counts = {}
+        self.search_card = Template(load_fixture("search_card.html"))
+        self.job_detail = Template(load_fixture("job_detail.html"))
+        self.descriptions = [load_fixture(name) for name in sorted(os.listdir(FIXTURES_DIR)) if name.startswith("description_")]
+
+    def count(self, key):
+        with self.lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def should_fail(self, rate):
+        with self.lock:
+            return self.random.random() < rate
+
+    def job_ids(self, keywords):
+        shared = int(self.settings.jobs_per_query * self.settings.overlap)
+        base = SHARED_JOB_ID_BASE + (zlib.crc32(keywords.lower().encode("utf-8")) % 100000) * 1000
+        return [SHARED_JOB_ID_BASE + i if i < shared else base + i for i in range(self.settings.jobs_per_query)]
+
+    def search_results(self, keywords, cell):
+        """
+        Returns (job id, title) pairs for a search. A '"A" OR "B"' search finds the union of what its terms find alone,
+        interleaved.
+        """
+        terms = OR_TERM_PATTERN.findall(keywords) or [keywords]
+        results = {}
+        for ranked in zip(*[[(job_id, term.title()) for job_id in self.job_ids(term + cell)] for term in terms]):
+            for job_id, title in ranked:
+                results.setdefault(job_id, title)
+        return list(results.items())
+
+    @staticmethod
+    def slug(text):
+        return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+    def render_card(self, base_url, job_id, position, title):
+        company = companies[job_id % len(companies)]
+        return self.search_card.safe_substitute(base_url=base_url, job_id=job_id, position=position, title=title,
+                                                slug=f"{self.slug(title)}-at-{self.slug(company)}", company=company,
+                                                company_slug=self.slug(company))
+
+    def render_job(self, base_url, job_id, title):
+        company = companies[job_id % len(companies)]
+        similar_jobs = "".join(self.render_card(base_url, job_id + 7919 * (i + 1), i, title) for i in range(SIMILAR_JOBS_PER_PAGE))
+        return self.job_detail.safe_substitute(job_id=job_id, title=title, slug=self.slug(title), company=company,
+                                               company_slug=self.slug(company), recruiter=recruiters[job_id % len(recruiters)],
+                                               description=f"{self.descriptions[job_id % len(self.descriptions)]}<br><br>Requisition ID: {job_id}",
+                                               similar_jobs=similar_jobs)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Serves the LinkedIn guest search fragments and job pages from the fixtures and mimics the chat-completions API.
+    """
+
+    protocol_version = "HTTP/1.1"
+    state = None
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def base_url(self):
+        return f"http://{self.headers.get('Host')}"
+
+    def send_body(self, status, body, content_type, headers=None):
+        body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_throttled(self):
+        self.send_body(429, "Too Many Requests", "text/plain", {"Retry-After": "1", "retry-after-ms": "200"})
+
+    def do_GET(self):
+        settings = self.state.settings
+        url = urlparse(self.path)
+        if settings.page_latency:
+            time.sleep(settings.page_latency)
+        if url.path == GUEST_SEARCH_PATH:
+            self.state.count("search")
+            if self.state.should_fail(settings.page_error_rate):
+                return self.send_throttled()
+            query = parse_qs(url.query)
+            keywords = query.get("keywords", [""])[0]
+            start = int(query.get("start", ["0"])[0])
+            # each location, job type and seniority cell has its own postings, overlap aside
+            cell = "|".join(query.get(key, [""])[0] for key in ("location", "f_JT", "f_E"))
+            cell = "" if cell == "India|F|2" else cell
+            results = self.state.search_results(keywords, cell)[start:start + SEARCH_PAGE_SIZE]
+            cards = "".join(self.state.render_card(self.base_url, job_id, start + i, title) for i, (job_id, title) in enumerate(results))
+            return self.send_body(200, cards, "text/html; charset=utf-8")
+        if url.path.startswith(JOB_VIEW_PREFIX):
+            self.state.count("job")
+            if self.state.should_fail(settings.page_error_rate):
+                return self.send_throttled()
+            slug, _, job_id = url.path[len(JOB_VIEW_PREFIX):].rstrip("/").rpartition("-")
+            # postings never change here, so the job id is a valid validator for conditional requests
+            etag = f'"{job_id}"'
+            if self.state.should_fail(settings.captcha_rate):
+                self.state.count("captcha")
+                return self.send_body(200, CAPTCHA_PAGE, "text/html; charset=utf-8")
+            if self.headers.get("If-None-Match") == etag:
+                self.state.count("job_not_modified")
+                return self.send_body(304, "", "text/html; charset=utf-8", {"ETag": etag})
+            title = slug.split("-at-")[0].replace("-", " ").title() or "Software Engineer"
+            return self.send_body(200, self.state.render_job(self.base_url, int(job_id), title), "text/html; charset=utf-8",
+                                  {"ETag": etag})
+        self.send_body(404, "Not Found", "text/plain")
+
+    def do_POST(self):
+        settings = self.state.settings
+        url = urlparse(self.path)
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if url.path != CHAT_COMPLETIONS_PATH:
+            return self.send_body(404, "Not Found", "text/plain")
+        self.state.count("llm")
+        if settings.llm_latency:
+            time.sleep(settings.llm_latency)
+        if self.state.should_fail(settings.llm_error_rate):
+            return self.send_throttled()
+        messages = payload["messages"]
+        json_mode = payload.get("response_format", {}).get("type") == "json_object"
+        completion = self.completion(messages[0]["content"], payload.get("model", "gpt-3.5-turbo"), json_mode)
+        if len(messages) == 1 and self.state.should_fail(settings.llm_malformed_rate):
+            self.state.count("llm_malformed")
+            content = completion["choices"][0]["message"]["content"]
+            completion["choices"][0]["message"]["content"] = content[:len(content) // 2]
+        elif len(messages) > 1:
+            self.state.count("llm_repair")
+        self.send_body(200, json.dumps(completion), "application/json")
+
+    @staticmethod
+    def completion(prompt, model, json_mode=False):
+        details = {'skills': {'preferredSkills': ['SQL', 'Python', 'Excel']}, 'min_ctc': 600000, 'max_ctc': 900000,
+                   'min_experience': 1, 'max_experience': 3, 'hr_name': '', 'department': 'Analytics'}
+        ids = re.findall(r"\nid: (\d+)\n", prompt)
+        if ids:
+            jobs = [{'id': int(id)} | details for id in ids]
+            # JSON mode only returns objects, so the batch prompt asks for the array under 'jobs'
+            content = json.dumps({'jobs': jobs} if json_mode else jobs)
+        else:
+            content = json.dumps(details)
+        prompt_tokens = len(prompt) // 4
+        completion_tokens = len(content) // 4
+        return {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+
+def start_stub_server(settings, host="127.0.0.1", port=0):
+    """
+    Starts the stand-in server on a daemon thread and returns (server, base_url). Request counts per kind are kept in
+    server.stub_state.counts.
+    """
+    handler = type("BoundStubHandler", (StubHandler,), {"state": StubState(settings)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.stub_state = handler.state
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the LinkedIn guest pages and the OpenAI chat-completions API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--jobs-per-query", type=int, default=100)
+    parser.add_argument("--overlap", type=float, default=0.0)
+    parser.add_argument("--page-latency", type=float, default=0.0)
+    parser.add_argument("--llm-latency", type=float, default=0.0)
+    parser.add_argument("--page-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--captcha-rate", type=float, default=0.0)
+    parser.add_argument("--llm-malformed-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    settings = StubSettings(jobs_per_query=args.jobs_per_query, overlap=args.overlap, page_latency=args.page_latency,
+                            llm_latency=args.llm_latency, page_error_rate=args.page_error_rate, llm_error_rate=args.llm_error_rate,
+                            captcha_rate=args.captcha_rate, llm_malformed_rate=args.llm_malformed_rate)
+    server, base_url = start_stub_server(settings, host=args.host, port=args.port)
+    print(f"serving on {base_url}, point linkedin_base_url and openai_base_url at it")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
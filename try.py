@@ -1,36 +1,66 @@
-
 #
 # Copyright (c) 2023 Airbyte, Inc., all rights reserved.
 #
 
 
+import ast
+import hashlib
+import html
+import itertools
 import json
 import os
+import random
+import sqlite3
 from typing import Dict, Generator
 
 from airbyte_cdk.logger import AirbyteLogger
 from airbyte_cdk.models import (
     AirbyteCatalog,
     AirbyteConnectionStatus,
+    AirbyteLogMessage,
     AirbyteMessage,
     AirbyteRecordMessage,
     AirbyteStream,
     ConfiguredAirbyteCatalog,
+    Level,
     Status,
     Type,
 )
 from airbyte_cdk.sources import Source
 import re
+import sys
 import requests
-from airbyte_protocol.models import AirbyteStateMessage, AirbyteStateType, AirbyteStreamState, StreamDescriptor
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import quote, unquote, urlparse
+from airbyte_protocol.models import AirbyteStateBlob, AirbyteStateMessage, AirbyteStateType, AirbyteStreamState, StreamDescriptor
+from bs4 import BeautifulSoup, SoupStrainer
 import time
 from selenium import webdriver
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
-from datetime import datetime
+from selenium.common.exceptions import TimeoutException, WebDriverException
 import logging
+import multiprocessing
+import queue
+import threading
+import zlib
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import Future, ThreadPoolExecutor
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    HTMLParser = None
+try:
+    import lxml
+except ImportError:
+    lxml = None
+try:
+    import orjson
+except ImportError:
+    orjson = None
 logger = logging.getLogger()
 logging.basicConfig(level=logging.NOTSET)
 
@@ -45,7 +75,154 @@ chrome_options.add_argument('--disable-browser-side-navigation')
 chrome_options.add_argument('--disable-infobars')
 chrome_options.add_argument('--disable-extensions')
 
-driver = webdriver.Chrome(executable_path=os.getenv("CHROME_DRIVER_PATH"), options=chrome_options)
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_DRIVER_POOL_SIZE = 1
+DEFAULT_DISCOVERY_AHEAD = 2
+DEFAULT_EMIT_MODE = 'messages'
+DEFAULT_EMIT_BATCH_SIZE = 500
+SHARD_QUEUE_SIZE = 1000
+SHARD_POLL_INTERVAL = 1.0
+# config paths each local shard process gets its own copy of, suffixed with the shard index
+SHARD_LOCAL_PATHS = ('job_index_path', 'metrics_file', 'page_cache_path', 'near_duplicate_index_path')
+PIPELINE_IN_FLIGHT_PER_WORKER = 4
+DEFAULT_MAX_PAGES_PER_DRIVER = 50
+DEFAULT_DISCOVERY_MODE = 'http'
+DEFAULT_DISCOVERY_PARALLELISM = 4
+DEFAULT_DISCOVERY_MAX_RESULTS = 1000
+DEFAULT_SEARCH_LOCATION = 'India'
+DEFAULT_SEARCH_JOB_TYPE = 'full_time'
+DEFAULT_SEARCH_JOB_LEVEL = 'entry_level'
+SEARCH_MATRIX_DIMENSIONS = ('location', 'job_type', 'past_time', 'job_level')
+DEFAULT_MATRIX_PARALLELISM = 4
+# links found by the search cells waiting for discovery to pass them on, the cells pause while it is full
+SEARCH_CELL_QUEUE_SIZE = 100
+PAST_TIME_WINDOW_PATTERN = re.compile(r'r\d+')
+DEFAULT_SCROLL_STEP_TIMEOUT = 5
+SCROLL_POLL_INTERVAL = 0.2
+PIPELINE_POLL_INTERVAL = 0.05
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_READ_TIMEOUT = 60
+DEFAULT_HTTP_RETRIES = 3
+DEFAULT_HTTP_BACKOFF = 0.5
+DEFAULT_LINKEDIN_INITIAL_CONCURRENCY = 4
+DEFAULT_LINKEDIN_LATENCY_THRESHOLD = 5.0
+LINKEDIN_MAX_RETRIES = 3
+THROTTLE_BASE_INTERVAL = 0.5
+THROTTLE_MAX_INTERVAL = 10.0
+THROTTLE_BASE_PAUSE = 2.0
+THROTTLE_MAX_PAUSE = 120.0
+THROTTLE_INTERVAL_DECAY = 0.9
+THROTTLE_LATENCY_DECREASE = 0.9
+BLOCK_STATUS_CODES = (429, 999)
+BLOCK_URL_MARKERS = ('/authwall', '/checkpoint/')
+BLOCK_PAGE_MARKERS = (b'g-recaptcha', b'captcha-internal', b'/checkpoint/challenge')
+DEFAULT_JOB_INDEX_TTL = 30 * 24 * 60 * 60
+DEFAULT_LLM_CACHE_MAX_ENTRIES = 50000
+DEFAULT_LLM_CACHE_TTL = 30 * 24 * 60 * 60
+# local shards share the cache file, a writer waits this long for another shard's write to finish
+LLM_CACHE_BUSY_TIMEOUT = 30.0
+DEFAULT_NEAR_DUPLICATE_THRESHOLD = 0.9
+DEFAULT_NEAR_DUPLICATE_TTL = 30 * 24 * 60 * 60
+NEAR_DUPLICATE_NUM_PERM = 64
+NEAR_DUPLICATE_BANDS = 16
+NEAR_DUPLICATE_SHINGLE_SIZE = 5
+# numbers this long are requisition or job ids, shorter ones (salary, experience, openings) must match exactly
+NEAR_DUPLICATE_ID_DIGITS = 8
+MINHASH_PRIME = (1 << 61) - 1
+DEFAULT_PAGE_CACHE_TTL = 14 * 24 * 60 * 60
+DEFAULT_PAGE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_PAGE_CACHE_FRESH_SECONDS = 0
+DEFAULT_OPENAI_RPM = 500
+DEFAULT_OPENAI_TPM = 60000
+OPENAI_MAX_RETRIES = 5
+DEFAULT_LLM_BATCH_SIZE = 1
+DEFAULT_LLM_BATCH_MAX_WAIT = 0.5
+DEFAULT_LLM_BATCH_MAX_CHARS = 2000
+DEFAULT_METRICS_INTERVAL = 60
+DEFAULT_PAST_TIME = 'day'
+# re-search this much before the role cursor so postings indexed late by LinkedIn are not missed
+CURSOR_LOOKBACK_SECONDS = 60 * 60
+DEFAULT_SEEN_JOB_IDS_TTL = 7 * 24 * 60 * 60
+MAX_SEEN_JOB_IDS_PER_ROLE = 1000
+DEFAULT_ROLE_BACKOFF_AFTER = 3
+DEFAULT_ROLE_BACKOFF_SECONDS = 12 * 60 * 60
+DEFAULT_ROLE_BACKOFF_MAX_SECONDS = 7 * 24 * 60 * 60
+ROLE_BACKOFF_MAX_DOUBLINGS = 16
+ROLE_STATS_SMOOTHING = 0.3
+ROLE_MIN_DISCOVERY_SECONDS = 0.1
+METRICS_PREFIX = "linkedin_source"
+METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+# bump whenever the extraction prompt changes so cached answers to the old prompt are not reused
+EXTRACTION_PROMPT_VERSION = 2
+MAX_PREFERRED_SKILLS = 5
+# skill_matcher's vocabulary is the Analyst role list, for other roles a match or two says little about the posting
+DEFAULT_LOCAL_SKILLS_MIN_TERMS = 3
+EXTRACTION_FIELDS_PROMPT = "{'skills': {'preferredSkills': []}, 'min_ctc': , 'max_ctc': , 'min_experience': , 'max_experience': , 'hr_name': '', 'department': }" \
+                           "put maximum 5 items inside preferredSkills and those skills should be keywords only." \
+                           "if min_ctc, max_ctc, min_experience, max_experience, not available then put it zero" \
+                           "hr_name is about any name email or contact number available in the text, put empty string if not there" \
+                           "treat this text as job description and extract what portion or department of the company this job description would be for, put that inside department"
+# used when the skills were already found locally by skill_matcher
+EXTRACTION_FIELDS_PROMPT_WITHOUT_SKILLS = "{'min_ctc': , 'max_ctc': , 'min_experience': , 'max_experience': , 'hr_name': '', 'department': }" \
+                                          "if min_ctc, max_ctc, min_experience, max_experience, not available then put it zero" \
+                                          "hr_name is about any name email or contact number available in the text, put empty string if not there" \
+                                          "treat this text as job description and extract what portion or department of the company this job description would be for, put that inside department"
+EXTRACTION_REPAIR_PROMPT = "That reply could not be used ({error}). Reply again with only the corrected JSON object in the requested format."
+EXTRACTION_REPAIR_ATTEMPTS = 1
+JOB_DETAILS_NUMBER_FIELDS = ('min_ctc', 'max_ctc', 'min_experience', 'max_experience')
+JOB_DETAILS_TEXT_FIELDS = ('hr_name', 'department')
+JSON_FENCE_PATTERN = re.compile(r'^```(?:json)?\s*|\s*```$')
+# "'min_ctc': ," as written in the prompt template
+EMPTY_JSON_VALUE_PATTERN = re.compile(r'(:\s*)(?=[,}\]])')
+TRAILING_COMMA_PATTERN = re.compile(r',\s*([}\]])')
+NUMBER_PATTERN = re.compile(r'-?\d+(?:\.\d+)?')
+
+LINKEDIN_BASE_URL = "https://www.linkedin.com"
+OPENAI_BASE_URL = "https://api.openai.com"
+JOB_SEARCH_PATH = "/jobs/search?"
+GUEST_JOB_SEARCH_PATH = "/jobs-guest/jobs/api/seeMoreJobPostings/search?"
+GUEST_JOB_SEARCH_PAGE_SIZE = 25
+JOB_CARD_SELECTOR = "ul.jobs-search__results-list > li"
+# returns the number of result cards and the job links of the cards from index arguments[1] on
+HARVEST_JOB_LINKS_SCRIPT = """
+const cards = document.querySelectorAll(arguments[0]);
+const hrefs = [];
+for (let i = arguments[1]; i < cards.length; i++) {
+    const link = cards[i].querySelector('a.base-card__full-link');
+    if (link && link.href) {
+        hrefs.push(link.href);
+    }
+}
+return [cards.length, hrefs];
+"""
+# the recency window is recomputed from the role cursor on every run, so it is left out of cached search page keys
+SEARCH_PAGE_VOLATILE_PARAM_PATTERN = re.compile(r'(?<=[?&])f_TPR=[^&]*&?')
+JOB_ID_PATTERN = re.compile(r'(\d{6,})$')
+HTML_TAG_PATTERN = re.compile('<.*?>')
+DEFAULT_JD_TOKEN_BUDGET = 600
+# tags become spaces in job_description_raw_text, so runs of whitespace mark the former block boundaries
+JD_BLOCK_SPLIT_PATTERN = re.compile(r'\s{2,}|\n')
+JD_SENTENCE_SPLIT_PATTERN = re.compile(r'(?<=[.!?;])\s+(?=[A-Z(])')
+JD_HEADER_MAX_WORDS = 6
+JD_BOILERPLATE_SECTION_PATTERN = re.compile(
+    r'^(about (us|the company|the organi[sz]ation|our company)|who we are|our (story|culture|values|mission)|life at|why join|'
+    r'equal (employment )?opportunit|eeo\b|diversity|disclaimer)', re.IGNORECASE)
+JD_BOILERPLATE_SENTENCE_PATTERN = re.compile(
+    r'equal (employment )?opportunity|without regard to|do not discriminate|reasonable accommodation|protected characteristic|'
+    r'qualified applicants will receive|value diversity', re.IGNORECASE)
+# sentences likely to carry what the extraction asks for: skills, CTC, experience, contact details and department
+JD_RELEVANT_PATTERN = re.compile(
+    r'\d|experience|years?\b|yrs|ctc|lpa|salary|compensation|package|skill|require|qualif|proficien|knowledge|responsib|'
+    r'department|team|contact|e-?mail|@|reach out|phone|recruit|\bhr\b', re.IGNORECASE)
+DEFAULT_QUERY_MAX_TERMS = 5
+ROLE_SEPARATOR_PATTERN = re.compile(r'[^a-z0-9+#]+')
+# "React.js", "React Js" and "ReactJS" all search for the same postings as "React"
+ROLE_JS_SUFFIX_PATTERN = re.compile(r'(?<=[a-z0-9]) ?js\b')
+ROLE_SPELLING_PATTERNS = ((re.compile(r'\b(front|back) end\b'), r'\1end'), (re.compile(r'\bfull stack\b'), 'fullstack'))
+HIRING_TEAM_CLASS = 'base-main-card__title font-sans text-[18px] font-bold text-color-text overflow-hidden'
+# the only regions of a job page read() needs: top card, description markup and the hiring team card title
+JOB_PAGE_REGION_CLASSES = ['top-card-layout', 'show-more-less-html__markup', 'base-main-card__title']
+
 job_type_keys = {
     "full_time": "F",
     "part_time": "P"
@@ -65,8 +242,1852 @@ job_level_keys = {
 }
 
 
+dummy_job_roles = ["Angular Developer", "Angular JS Developer", "Associate Software Engineer", "Backend Developer", "C# Developer",
+                  "C++ Developer", "Developer", "Client-Side Developer", "Embedded Software Developer", "Embedded Software Engineer",
+                  "Front End Web Developer", "Front-End Developer", "Frontend Angular Developer", "Frontend Architect",
+                  "Frontend Developer", "Frontend Engineer", "Frontend Web Developer", "Full Stack Developer",
+                  "Full Stack Java Developer", "Full Stack Software Engineer", "HTML Developer", "Java Backend Developer",
+                  "Java Developer", "Java Fullstack Developer", "Java Microservices Developer", "Java React Developer",
+                  "Java SpringBoot Developer", "Javascript Developer", "Junior Software Developer", "Junior Software Engineer",
+                  "Mean Stack Developer", "MERN Stack Developer", "MIS", "MIS Analyst", "MIS Executive and Analyst",
+                  "Node JS Developer", "Node.js Developer", "Python Developer", "Python/Django Developer", "React Developer",
+                  "React Js Developer", "React.js Developer", "React/Frontend Developer", "React+Node Js Developer",
+                  "RIM Support Engineer", "Ruby on Rails Developer", "SAP HANA DB Administration Software Development Engineer",
+                  "Software Developer", "Software Development Engineer", "Software Engineer", "Software Engineer Trainee",
+                  "Software Programmer", "Solution Developer", "SYBASE Database Administration Software Development Engineer",
+                  "Trainee Associate Engineer", "Trainee Software Developer", "Trainee Software Engineer", "UI Angular Developer",
+                  "UI Developer", "UI Frontend Developer", "UI/Frontend Developer", "UI/UX Developer", "Web and Software Developer",
+                  "Web Designer & Developer", "Web Designer and Developer", "Web Designer/Developer", "Web Developer",
+                  "Web Developer and Designer", "Website Designer", "website developer", "XML and C# Developer", "PHP Developer",
+                  "Laravel Developer", "Magento Developer", "Drupal Developer", "Dotnet developer", ".net ", "Vue.JS Developer",
+                  "Python/Django Developer", "GoLang developer", "jQuery", "Springboot Developer", "Actuarial Analyst", "Analyst",
+                  "AR Analyst", "Associate Business Analyst", "Automation Test Analyst", "Azure Data Engineer", "Big Data Engineer",
+                  "Business Analyst", "Business Data Analyst", "Data Analyst", "Data Analytics Trainer", "Data Research Analyst",
+                  "Data Researcher", "Data Science Engineer", "Data Scientist", "Database Administrator", "Functional Analyst",
+                  "Junior Analyst", "Junior Research Analyst", "KYC Analyst", "Market Research Analyst", "Power BI Developer",
+                  "Product Analyst", "Programmer Analyst", "QA Analyst", "Quality Analyst", "Real Time Analyst",
+                  "Reconciliation Analyst", "Research Analyst", "Risk Analyst", "Sales Analyst", "Salesforce Business Analyst",
+                  "Service Desk Analyst", "SOC Analyst", "SQL Developer", "Android Application Developer", "Android Developer",
+                  "Android Mobile Application Developer", "Application Developer", "Application Support Engineer",
+                  "Flutter Developer", "iOS Application Developer", "IOS Developer", "Mobile App Developer",
+                  "Mobile Application Developer", "Associate Technical Support Engineer", "Automation Engineer",
+                  "Automation Test Engineer", "Batch Support Engineer", "Desktop Support Engineer", "Genesys Support Engineer",
+                  "IT Support Engineer", "Network Support Engineer", "QA Automation Engineer", "SaaS Support Engineer",
+                  "Security Engineer", "Test Automation Engineer", "Systems Support Engineer",
+                  "Software Development Engineer - Test", "Software Test Engineer", "Software Tester", "Support Engineer",
+                  "Tech Customer Support Engineer", "Technical Support Engineer", "Servicenow Developer", "SharePoint Developer",
+                  "Shopify Developer", "Unity Game Developer", "WordPress & Shopify Developer", "WordPress Developer",
+                  "Wordpress Web Developer", "Unreal Developer"]
+
+analyst_job_roles = [
+    "Analyst",
+    "Analytical",
+    "analytical skill",
+    "Analytical Skills",
+    "Analytics",
+    "BeautifulSoup",
+    "big data",
+    "Bigcommerce",
+    "BIGDATA",
+    "Business analysis",
+    "Business process",
+    "Business Process Management",
+    "Business Requirement Analysis",
+    "Caffe",
+    "cassandra",
+    "Consulting",
+    "CuDNN",
+    "data acquisition",
+    "Data analysis",
+    "Data Architecture",
+    "Data Engineer",
+    "Data Engineering",
+    "Data Factory",
+    "data governance",
+    "Data Loader",
+    "Data Management",
+    "Data Migration",
+    "Data modeling",
+    "Data Models",
+    "data pipeline architecture",
+    "Data processing",
+    "data protection",
+    "Data quality",
+    "data science",
+    "Data validation",
+    "Data verse in PowerAERROR!",
+    "data warehouse",
+    "Data-Binding",
+    "Database Design",
+    "Database management",
+    "Database Schema",
+    "DAX queries",
+    "Db2",
+    "Dynamo Db",
+    "ETL",
+    "ETL design",
+    "Excel",
+    "Hadoop",
+    "IT Security Analyst",
+    "Lambda/function",
+    "mangodb",
+    "microsoft",
+    "Microsoft Azure",
+    "Microsoft azure data factory",
+    "Mongo DB",
+    "MongoDB",
+    "MS Access",
+    "MS Office",
+    "MS SQL",
+    "Ms Sql Database",
+    "Ms Sql Serve",
+    "MSMQ",
+    "MSSQL",
+    "Mysq",
+    "MySQL",
+    "MySQL. HTML",
+    "NLP",
+    "NoSQL",
+    "OpenCV",
+    "Phyton",
+    "Pinecone DB",
+    "PL/SQL",
+    "PLSQL",
+    "Postgres",
+    "Postgresql",
+    "Power BI",
+    "Problem Solving",
+    "Problem Solving & Analytical Skills",
+    "Process Analytics",
+    "PySpark",
+    "Python",
+    "Python Development",
+    "Python Framework",
+    "python progaraming",
+    "RDBMS",
+    "Rdbms Concepts",
+    "RDS",
+    "redshift",
+    "Relational database",
+    "relational databases",
+    "Scala",
+    "scrapy",
+    "scrapy framework",
+    "Spark",
+    "SQL",
+    "SQL Azure",
+    "SQL Database",
+    "sql knowledge",
+    "SQL queries",
+    "SQL Server",
+    "SQL Server ASP.Net",
+    "SQL Server Development",
+    "SQLit",
+    "SQLite",
+    "SQLite Database",
+    "sqs",
+    "SSIS",
+    "SSRS",
+    "Stored procedures",
+    "tableau",
+    "TensorFlow",
+    "Theano",
+    "Torch",
+    "Triggers",
+    "Advanced Excel",
+    "BA",
+    "business Analyst",
+    "Business Analytics",
+    "Business Intelligence (BI)",
+    "data analyst",
+    "data analytics",
+    "data cleansing",
+    "Data Scraping",
+    "Database",
+    "Database Planning",
+    "database structures",
+    "Databases Postgres",
+    "ETL Tool",
+    "Extraction",
+    "Fabrication",
+    "Google Analytics",
+    "H look up",
+    "macros",
+    "Management Information System",
+    "Microsoft applications",
+    "MIS",
+    "MS SQLServer",
+    "MS-Excel",
+    "Nosql Databases",
+    "numpy",
+    "Outlook",
+    "panda",
+    "PowerPoint.",
+    "Qlik",
+    "query",
+    "Regression testing",
+    "Regular Expressions",
+    "spreadsheets",
+    "statistical analyses",
+    "vlook up",
+    "Warehousing",
+    "WCF Data Services",
+    "Word",
+    "AI",
+    "analysis",
+    "Analysts",
+    "Associate Analyst",
+    "bi",
+    "Bi Tools",
+    "BigQuery",
+    "business analyst bpo",
+    "business intelligence",
+    "Business operations",
+    "business process analysis",
+    "business requirements",
+    "Business Research",
+    "Business services",
+    "business system",
+    "Concatenate",
+    "CouchD",
+    "dashboards",
+    "Data collection",
+    "data collection systems",
+    "Data communication",
+    "Data entry operation",
+    "data integrity",
+    "Data Mapping",
+    "data mining",
+    "Data Reporting",
+    "Data Sciences",
+    "data visualization",
+    "Data warehousing",
+    "Database Management System",
+    "Database testing",
+    "DB",
+    "dbms",
+    "deep learning",
+    "excel google analytics",
+    "Google Sheets",
+    "hlookup",
+    "Index Optimization",
+    "IT Business Analyst",
+    "IT Consulting",
+    "IT Management",
+    "IT Operations Management",
+    "looker",
+    "Mango Db",
+    "Marketing analytics",
+    "Marketing operations",
+    "Mathematics",
+    "Memcached",
+    "Microstrategy",
+    "MIS documentation",
+    "Mis Report Preparation",
+    "MIS reporting",
+    "Ms excel",
+    "Natural language processing",
+    "Php And Mysql",
+    "Php Codeigniter",
+    "Pivot",
+    "pivot table",
+    "PL-SQL",
+    "Portfolio management",
+    "postgrest",
+    "Power Query",
+    "Powerpoint",
+    "predictive analytics",
+    "prescriptive analytics",
+    "Python or PHP",
+    "R",
+    "Reporting tools",
+    "Risk analysis",
+    "SAS",
+    "Schema",
+    "Senior Analyst",
+    "Site Analysis",
+    "Snowflake DB",
+    "SPSS",
+    "Statistical process control",
+    "Statistical Tools",
+    "statistics",
+    "System analysis",
+    "Systems Analysis",
+    "T-SQL",
+    "Teradata",
+    "VB SCRIPT",
+    "VBA",
+    "vlookup",
+    "Webmaster",
+    "Website Analysis",
+    "zoho analytics",
+]
+
+# vocabulary spellings (normalized) that should be reported under a single canonical name
+skill_aliases = {
+    "mangodb": "MongoDB",
+    "mango db": "MongoDB",
+    "mongo db": "MongoDB",
+    "mongodb": "MongoDB",
+    "mysq": "MySQL",
+    "mysql": "MySQL",
+    "phyton": "Python",
+    "python progaraming": "Python",
+    "python": "Python",
+    "postgres": "PostgreSQL",
+    "postgresql": "PostgreSQL",
+    "postgrest": "PostgreSQL",
+    "databases postgres": "PostgreSQL",
+    "sqlit": "SQLite",
+    "sqlite": "SQLite",
+    "ms sql serve": "SQL Server",
+    "ms sqlserver": "SQL Server",
+    "sql server": "SQL Server",
+    "mssql": "MS SQL",
+    "ms sql": "MS SQL",
+    "pl-sql": "PL/SQL",
+    "plsql": "PL/SQL",
+    "pl/sql": "PL/SQL",
+    "ms-excel": "Excel",
+    "ms excel": "Excel",
+    "excel": "Excel",
+    "vlook up": "VLOOKUP",
+    "vlookup": "VLOOKUP",
+    "h look up": "HLOOKUP",
+    "hlookup": "HLOOKUP",
+    "bigdata": "Big Data",
+    "big data": "Big Data",
+    "panda": "Pandas",
+    "pandas": "Pandas",
+    "numpy": "NumPy",
+    "tableau": "Tableau",
+    "redshift": "Redshift",
+    "power bi": "Power BI",
+    "powerpoint": "PowerPoint",
+    "looker": "Looker",
+    "spark": "Spark",
+    "pyspark": "PySpark",
+    "nosql databases": "NoSQL",
+    "nosql": "NoSQL",
+    "dynamo db": "DynamoDB",
+    "dynamodb": "DynamoDB",
+    "snowflake db": "Snowflake",
+    "snowflake": "Snowflake",
+    "couchd": "CouchDB",
+    "couchdb": "CouchDB",
+}
+# vocabulary entries that are role titles or too generic to count as a skill on their own
+skill_stopwords = {
+    "analyst", "analysts", "analytical", "analytical skill", "analytical skills", "analysis", "associate analyst", "senior analyst",
+    "business analyst", "business analyst bpo", "data analyst", "it business analyst", "it security analyst", "ba", "bi", "ai",
+    "db", "r", "word", "query", "microsoft", "mathematics", "extraction", "fabrication", "consulting", "schema", "triggers",
+    "pivot", "concatenate", "outlook", "database", "data verse in poweraerror!", "mysql. html", "python or php",
+    "php and mysql", "problem solving", "problem solving & analytical skills", "business services", "site analysis",
+}
+
+
+class Metrics:
+    """
+    Counters, gauges, per-stage latency histograms and in-flight gauges for the sync hot path. When disabled every
+    call returns immediately and timer() hands back a shared no-op context manager.
+    """
+
+    _disabled_timer = nullcontext()
+
+    def __init__(self, enabled=False, interval_seconds=DEFAULT_METRICS_INTERVAL, prometheus_path=None):
+        self.enabled = enabled
+        self.interval_seconds = interval_seconds
+        self.prometheus_path = prometheus_path
+        self.counters = {}
+        self.gauges = {}
+        self.in_flight = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+        self._last_emitted_at = time.monotonic()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            enabled=bool(config.get('metrics_enabled', False)),
+            interval_seconds=float(config.get('metrics_interval_seconds', DEFAULT_METRICS_INTERVAL)),
+            prometheus_path=config.get('metrics_file'),
+        )
+
+    def increment(self, name, value=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_gauge(self, name, value):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.gauges[name] = value
+
+    def observe(self, stage, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = {'buckets': [0] * len(METRICS_BUCKETS), 'sum': 0.0, 'count': 0}
+            for index, bound in enumerate(METRICS_BUCKETS):
+                if seconds <= bound:
+                    histogram['buckets'][index] += 1
+                    break
+            histogram['sum'] += seconds
+            histogram['count'] += 1
+
+    def timer(self, stage):
+        if not self.enabled:
+            return self._disabled_timer
+        return self._timed(stage)
+
+    @contextmanager
+    def _timed(self, stage):
+        with self._lock:
+            self.in_flight[stage] = self.in_flight.get(stage, 0) + 1
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started_at
+            with self._lock:
+                self.in_flight[stage] -= 1
+            self.observe(stage, elapsed)
+
+    def due(self):
+        return self.enabled and time.monotonic() - self._last_emitted_at >= self.interval_seconds
+
+    def snapshot(self):
+        with self._lock:
+            self._last_emitted_at = time.monotonic()
+            return {
+                'counters': dict(self.counters),
+                'gauges': dict(self.gauges),
+                'in_flight': dict(self.in_flight),
+                'stages': {
+                    stage: {'count': histogram['count'], 'sum_seconds': round(histogram['sum'], 6),
+                            'mean_seconds': round(histogram['sum'] / histogram['count'], 6) if histogram['count'] else 0.0}
+                    for stage, histogram in self.histograms.items()
+                },
+            }
+
+    def to_prometheus(self):
+        lines = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                lines += [f"# TYPE {METRICS_PREFIX}_{name}_total counter", f"{METRICS_PREFIX}_{name}_total {value}"]
+            for name, value in sorted(self.gauges.items()):
+                lines += [f"# TYPE {METRICS_PREFIX}_{name} gauge", f"{METRICS_PREFIX}_{name} {value}"]
+            lines.append(f"# TYPE {METRICS_PREFIX}_in_flight gauge")
+            for stage, value in sorted(self.in_flight.items()):
+                lines.append(f'{METRICS_PREFIX}_in_flight{{stage="{stage}"}} {value}')
+            lines.append(f"# TYPE {METRICS_PREFIX}_stage_seconds histogram")
+            for stage, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip(METRICS_BUCKETS, histogram['buckets']):
+                    cumulative += count
+                    lines.append(f'{METRICS_PREFIX}_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'{METRICS_PREFIX}_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {histogram["count"]}')
+                lines.append(f'{METRICS_PREFIX}_stage_seconds_sum{{stage="{stage}"}} {histogram["sum"]}')
+                lines.append(f'{METRICS_PREFIX}_stage_seconds_count{{stage="{stage}"}} {histogram["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self):
+        if not self.enabled or not self.prometheus_path:
+            return
+        tmp_path = f"{self.prometheus_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, self.prometheus_path)
+
+
+class HttpClient:
+    """
+    Shared HTTP layer for LinkedIn pages and OpenAI calls: one pooled keep-alive session with timeouts and retry with
+    exponential backoff on connection errors and 5xx responses. 429s are left to the callers' rate limiting.
+    """
+
+    def __init__(self, connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT, max_retries=DEFAULT_HTTP_RETRIES,
+                 backoff_factor=DEFAULT_HTTP_BACKOFF, pool_maxsize=DEFAULT_MAX_WORKERS):
+        self.timeout = (connect_timeout, read_timeout)
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'POST']),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            connect_timeout=float(config.get('http_connect_timeout', DEFAULT_CONNECT_TIMEOUT)),
+            read_timeout=float(config.get('http_read_timeout', DEFAULT_READ_TIMEOUT)),
+            max_retries=int(config.get('http_max_retries', DEFAULT_HTTP_RETRIES)),
+            backoff_factor=float(config.get('http_backoff_factor', DEFAULT_HTTP_BACKOFF)),
+            pool_maxsize=cls.pool_size(config),
+        )
+
+    @staticmethod
+    def pool_size(config):
+        # discovery, fetch and enrich run concurrently, each holding connections from the same session
+        max_workers = max(int(config.get('max_workers', DEFAULT_MAX_WORKERS)), 1)
+        search_matrix = SearchMatrix.from_config(config)
+        discovery_parallelism = int(config.get('discovery_parallelism', DEFAULT_DISCOVERY_PARALLELISM))
+        if len(search_matrix.cells) > 1:
+            discovery_parallelism = min(discovery_parallelism, search_matrix.cell_parallelism or discovery_parallelism)
+            discovery_parallelism *= min(search_matrix.parallelism, len(search_matrix.cells))
+        return int(config.get('fetch_workers', max_workers)) + int(config.get('enrich_workers', max_workers)) + discovery_parallelism
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.get(url, **kwargs)
+
+    def post(self, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.post(url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+class HostThrottle:
+    """
+    AIMD controller for per-host concurrency and request spacing. Each good response raises the host's concurrency
+    limit by 1/limit and shortens the spacing between requests, a response slower than latency_threshold or a request
+    that failed without a response shrinks the limit slightly, and a throttling signal (429, 999, CAPTCHA or authwall page) halves the limit, doubles the spacing
+    and pauses every worker on the host for Retry-After or an exponential backoff. Workers resume on their own once
+    the pause is over.
+    """
+
+    def __init__(self, initial_concurrency=DEFAULT_LINKEDIN_INITIAL_CONCURRENCY, max_concurrency=DEFAULT_MAX_WORKERS,
+                 min_interval=0.0, latency_threshold=DEFAULT_LINKEDIN_LATENCY_THRESHOLD, metrics=None):
+        self.initial_concurrency = min(initial_concurrency, max_concurrency)
+        self.max_concurrency = max_concurrency
+        self.min_interval = min_interval
+        self.latency_threshold = latency_threshold
+        self.metrics = metrics or Metrics()
+        self._hosts = {}
+        self._condition = threading.Condition()
+
+    @classmethod
+    def from_config(cls, config, metrics=None):
+        return cls(
+            initial_concurrency=max(int(config.get('linkedin_initial_concurrency', DEFAULT_LINKEDIN_INITIAL_CONCURRENCY)), 1),
+            max_concurrency=max(int(config.get('linkedin_max_concurrency', HttpClient.pool_size(config))), 1),
+            min_interval=float(config.get('linkedin_min_interval', 0.0)),
+            latency_threshold=float(config.get('linkedin_latency_threshold', DEFAULT_LINKEDIN_LATENCY_THRESHOLD)),
+            metrics=metrics,
+        )
+
+    def _host(self, host):
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = {'limit': float(self.initial_concurrency), 'in_flight': 0, 'interval': self.min_interval,
+                                         'next_at': 0.0, 'paused_until': 0.0, 'strikes': 0}
+        return state
+
+    def acquire(self, host):
+        with self._condition:
+            state = self._host(host)
+            while True:
+                now = time.monotonic()
+                wait = max(state['paused_until'], state['next_at']) - now
+                if wait <= 0 and state['in_flight'] < int(state['limit']):
+                    break
+                self._condition.wait(timeout=wait if wait > 0 else None)
+            state['in_flight'] += 1
+            state['next_at'] = now + state['interval']
+
+    def release(self, host, throttled=False, latency=0.0, retry_after=None, failed=False):
+        with self._condition:
+            state = self._host(host)
+            state['in_flight'] -= 1
+            now = time.monotonic()
+            if throttled:
+                self.metrics.increment('linkedin_throttled')
+                # responses already in flight when the host started throttling only count once
+                if now >= state['paused_until']:
+                    state['strikes'] += 1
+                    state['limit'] = max(1.0, state['limit'] / 2)
+                    state['interval'] = min(THROTTLE_MAX_INTERVAL, max(state['interval'] * 2, THROTTLE_BASE_INTERVAL))
+                    pause = min(retry_after if retry_after is not None else THROTTLE_BASE_PAUSE * 2 ** (state['strikes'] - 1),
+                                THROTTLE_MAX_PAUSE)
+                    state['paused_until'] = now + pause
+                    logger.info(f"{host} is throttling, pausing {pause:.1f}s with concurrency {int(state['limit'])}")
+            elif failed or latency > self.latency_threshold:
+                # a refused or reset connection is no sign the host can take more requests
+                state['limit'] = max(1.0, state['limit'] * THROTTLE_LATENCY_DECREASE)
+            else:
+                state['strikes'] = 0
+                state['limit'] = min(float(self.max_concurrency), state['limit'] + 1 / state['limit'])
+                state['interval'] = max(self.min_interval, state['interval'] * THROTTLE_INTERVAL_DECAY)
+            self.metrics.set_gauge('linkedin_concurrency_limit', round(state['limit'], 2))
+            self._condition.notify_all()
+
+
+class DriverPool:
+    """
+    Lazily started pool of long-lived Chrome drivers. A driver is health-checked before every checkout and recycled
+    once it has served max_pages_per_driver pages.
+    """
+
+    def __init__(self, size=DEFAULT_DRIVER_POOL_SIZE, max_pages_per_driver=DEFAULT_MAX_PAGES_PER_DRIVER, options=chrome_options,
+                 metrics=None):
+        self.size = size
+        self.max_pages_per_driver = max_pages_per_driver
+        self.options = options
+        self.metrics = metrics or Metrics()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._idle = []
+        self._pages = {}
+
+    @classmethod
+    def from_config(cls, config, metrics=None):
+        return cls(
+            size=max(int(config.get('driver_pool_size', DEFAULT_DRIVER_POOL_SIZE)), 1),
+            max_pages_per_driver=max(int(config.get('max_pages_per_driver', DEFAULT_MAX_PAGES_PER_DRIVER)), 1),
+            metrics=metrics,
+        )
+
+    def _start(self):
+        with self.metrics.timer('chrome_startup'):
+            driver = webdriver.Chrome(executable_path=os.getenv("CHROME_DRIVER_PATH"), options=self.options)
+        self.metrics.increment('chrome_starts')
+        self._pages[id(driver)] = 0
+        return driver
+
+    def _quit(self, driver):
+        self._pages.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.info(f"failed to quit driver: {str(e)}")
+
+    @staticmethod
+    def is_healthy(driver):
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    @contextmanager
+    def driver(self):
+        self._slots.acquire()
+        driver = None
+        try:
+            with self._lock:
+                driver = self._idle.pop() if self._idle else None
+            if driver is not None and not self.is_healthy(driver):
+                self._quit(driver)
+                driver = None
+            if driver is None:
+                driver = self._start()
+            try:
+                yield driver
+            except Exception:
+                if not self.is_healthy(driver):
+                    self._quit(driver)
+                    driver = None
+                raise
+        finally:
+            if driver is not None:
+                self._pages[id(driver)] = self._pages.get(id(driver), 0) + 1
+                if self._pages[id(driver)] >= self.max_pages_per_driver:
+                    self._quit(driver)
+                else:
+                    with self._lock:
+                        self._idle.append(driver)
+            self._slots.release()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self._quit(driver)
+
+
+class JobIndex:
+    """
+    Sync-wide index of the job postings already claimed for fetching, keyed on the LinkedIn job ID. A posting returned
+    by several role searches is fetched once; later hits only add the role to its association list. When given a
+    path, the index is loaded from and saved to a JSON file so it also spans runs. Only postings marked complete, i.e.
+    whose enriched records were emitted, are saved, so postings claimed by an interrupted or failed fetch are claimed
+    and fetched again by the next run. Saved postings expire ttl_seconds after they were completed.
+    """
+
+    def __init__(self, path=None, ttl_seconds=DEFAULT_JOB_INDEX_TTL):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._roles = {}
+        self._completed = {}
+        if path and os.path.exists(path):
+            with open(path) as f:
+                entries = json.load(f)
+            expires_before = time.time() - ttl_seconds
+            for job_id, entry in entries.items():
+                if entry['completed_at'] >= expires_before:
+                    self._roles[job_id] = entry['roles']
+                    self._completed[job_id] = entry['completed_at']
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(path=config.get('job_index_path'),
+                   ttl_seconds=float(config.get('job_index_ttl_seconds', DEFAULT_JOB_INDEX_TTL)))
+
+    @staticmethod
+    def job_id(jd_link):
+        path = str(jd_link).split("?")[0].rstrip("/")
+        match = JOB_ID_PATTERN.search(path)
+        if match:
+            return match.group(1)
+        return path.replace("https://in.", "https://www.")
+
+    def claim(self, jd_link, job_role):
+        """
+        Returns True if this is the first time the posting is seen, i.e. the caller should fetch it.
+        """
+        job_id = self.job_id(jd_link)
+        with self._lock:
+            roles = self._roles.get(job_id)
+            if roles is None:
+                self._roles[job_id] = [job_role]
+                return True
+            if job_role not in roles:
+                roles.append(job_role)
+            return False
+
+    def complete(self, jd_link):
+        with self._lock:
+            self._completed[self.job_id(jd_link)] = int(time.time())
+
+    def is_complete(self, jd_link):
+        with self._lock:
+            return self.job_id(jd_link) in self._completed
+
+    def __len__(self):
+        return len(self._roles)
+
+    def save(self):
+        if not self.path:
+            return
+        expires_before = time.time() - self.ttl_seconds
+        with self._lock:
+            data = json.dumps({job_id: {'roles': self._roles[job_id], 'completed_at': completed_at}
+                               for job_id, completed_at in self._completed.items() if completed_at >= expires_before})
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+
+class LlmCache:
+    """
+    On-disk cache of LLM extraction results keyed by a hash of the normalized job description, the prompt version and
+    the model. Entries expire after ttl_seconds and the least recently used ones are evicted beyond max_entries.
+    Without a path the cache only lives for the current sync. A file cache can be shared by the local shards; it runs
+    in WAL mode and a lookup or write that still finds the database locked is skipped rather than failing the job.
+    """
+
+    def __init__(self, path=None, max_entries=DEFAULT_LLM_CACHE_MAX_ENTRIES, ttl_seconds=DEFAULT_LLM_CACHE_TTL):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path or ':memory:', timeout=LLM_CACHE_BUSY_TIMEOUT, check_same_thread=False)
+        if path:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, value TEXT, created_at REAL, accessed_at REAL)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed_at ON llm_cache (accessed_at)")
+            self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            path=config.get('llm_cache_path'),
+            max_entries=max(int(config.get('llm_cache_max_entries', DEFAULT_LLM_CACHE_MAX_ENTRIES)), 1),
+            ttl_seconds=float(config.get('llm_cache_ttl_seconds', DEFAULT_LLM_CACHE_TTL)),
+        )
+
+    @staticmethod
+    def key(jd_text, model_engine, fields_prompt=EXTRACTION_FIELDS_PROMPT):
+        normalized = " ".join(str(jd_text).split())
+        return hashlib.sha256(
+            f"{EXTRACTION_PROMPT_VERSION}\x00{model_engine}\x00{fields_prompt}\x00{normalized}".encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        now = time.time()
+        try:
+            with self._lock, self._conn:
+                row = self._conn.execute("SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+                if row is None or row[1] < now - self.ttl_seconds:
+                    if row is not None:
+                        self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self.misses += 1
+                    return None
+                self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+                self.hits += 1
+        except sqlite3.OperationalError as e:
+            logger.info(f"llm cache lookup skipped: {str(e)}")
+            self.misses += 1
+            return None
+        return json.loads(row[0])
+
+    def put(self, key, value):
+        now = time.time()
+        try:
+            with self._lock, self._conn:
+                self._conn.execute("INSERT OR REPLACE INTO llm_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                                   (key, json.dumps(value), now, now))
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY accessed_at ASC LIMIT "
+                    "max(0, (SELECT COUNT(*) FROM llm_cache) - ?))", (self.max_entries,))
+        except sqlite3.OperationalError as e:
+            # the extraction itself succeeded, only its cache entry is lost
+            logger.info(f"llm cache write skipped: {str(e)}")
+
+    def hit_ratio(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class NearDuplicateIndex:
+    """
+    MinHash/LSH index over word shingles of already enriched job descriptions, so a re-posted job can reuse the earlier
+    extraction instead of another OpenAI call. Candidates sharing an LSH band are confirmed by their estimated Jaccard
+    similarity and must mention the same numbers (salary, experience), ignoring id-like ones. Persisted in sqlite when
+    given a path, otherwise it only lives for the current sync.
+    """
+
+    def __init__(self, path=None, threshold=DEFAULT_NEAR_DUPLICATE_THRESHOLD, ttl_seconds=DEFAULT_NEAR_DUPLICATE_TTL,
+                 num_perm=NEAR_DUPLICATE_NUM_PERM, bands=NEAR_DUPLICATE_BANDS, shingle_size=NEAR_DUPLICATE_SHINGLE_SIZE):
+        self.path = path
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        # fixed seed: signatures persisted by earlier runs must use the same permutations
+        rng = random.Random(num_perm)
+        self._permutations = [(rng.randrange(1, MINHASH_PRIME), rng.randrange(0, MINHASH_PRIME)) for _ in range(self.rows * bands)]
+        self._params = f"{self.rows * bands}:{bands}:{shingle_size}"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path or ':memory:', check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS near_duplicates (job_id TEXT PRIMARY KEY, jd_link TEXT, signature TEXT, numbers TEXT, "
+                "extraction TEXT, params TEXT, created_at REAL)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS near_duplicate_bands (band TEXT, job_id TEXT)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS near_duplicate_bands_band ON near_duplicate_bands (band)")
+            self._conn.execute("DELETE FROM near_duplicates WHERE created_at < ? OR params != ?",
+                               (time.time() - self.ttl_seconds, self._params))
+            self._conn.execute("DELETE FROM near_duplicate_bands WHERE job_id NOT IN (SELECT job_id FROM near_duplicates)")
+
+    @classmethod
+    def from_config(cls, config):
+        if not config.get('near_duplicate_detection', True):
+            return None
+        return cls(
+            path=config.get('near_duplicate_index_path'),
+            threshold=float(config.get('near_duplicate_threshold', DEFAULT_NEAR_DUPLICATE_THRESHOLD)),
+            ttl_seconds=float(config.get('near_duplicate_ttl_seconds', DEFAULT_NEAR_DUPLICATE_TTL)),
+        )
+
+    def sketch(self, jd_text):
+        """
+        Returns (signature, band keys, numbers) for a description.
+        """
+        words = re.findall(r'\w+', str(jd_text).lower())
+        shingles = {zlib.crc32(" ".join(words[i:i + self.shingle_size]).encode('utf-8'))
+                    for i in range(max(len(words) - self.shingle_size + 1, 1))}
+        signature = [min((a * shingle + b) % MINHASH_PRIME for shingle in shingles) & 0xffffffff for a, b in self._permutations]
+        band_keys = [f"{band}:{','.join(map(str, signature[band * self.rows:(band + 1) * self.rows]))}" for band in range(self.bands)]
+        numbers = "|".join(sorted({number for number in re.findall(r'\d+', str(jd_text)) if len(number) < NEAR_DUPLICATE_ID_DIGITS}))
+        return signature, band_keys, numbers
+
+    def find(self, sketch):
+        """
+        Returns {'job_id', 'jd_link', 'similarity', 'extraction'} of the most similar indexed description at or above
+        the threshold, or None.
+        """
+        signature, band_keys, numbers = sketch
+        placeholders = ",".join("?" * len(band_keys))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT job_id, jd_link, signature, extraction FROM near_duplicates WHERE numbers = ? AND job_id IN "
+                f"(SELECT job_id FROM near_duplicate_bands WHERE band IN ({placeholders}))", (numbers, *band_keys)).fetchall()
+        best = None
+        for job_id, jd_link, other_signature, extraction in rows:
+            other_signature = json.loads(other_signature)
+            similarity = sum(a == b for a, b in zip(signature, other_signature)) / len(signature)
+            if similarity >= self.threshold and (best is None or similarity > best['similarity']):
+                best = {'job_id': job_id, 'jd_link': jd_link, 'similarity': similarity, 'extraction': extraction}
+        if best is not None:
+            best['extraction'] = json.loads(best['extraction'])
+        return best
+
+    def add(self, sketch, job_id, jd_link, extraction):
+        signature, band_keys, numbers = sketch
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM near_duplicate_bands WHERE job_id = ?", (job_id,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO near_duplicates (job_id, jd_link, signature, numbers, extraction, params, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", (job_id, jd_link, json.dumps(signature), numbers, json.dumps(extraction), self._params,
+                                                 time.time()))
+            self._conn.executemany("INSERT INTO near_duplicate_bands (band, job_id) VALUES (?, ?)",
+                                   [(band_key, job_id) for band_key in band_keys])
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class PageCache:
+    """
+    On-disk cache of job pages and guest search pages keyed by canonical URL. Bodies are stored zlib-compressed and content-addressed, so
+    identical pages share one blob, alongside the ETag and Last-Modified validators used for conditional requests.
+    Entries not revalidated within ttl_seconds are dropped and the least recently used ones are evicted beyond
+    max_bytes of compressed bodies. In offline mode pages are only replayed from the cache.
+    """
+
+    def __init__(self, path, ttl_seconds=DEFAULT_PAGE_CACHE_TTL, max_bytes=DEFAULT_PAGE_CACHE_MAX_BYTES,
+                 fresh_seconds=DEFAULT_PAGE_CACHE_FRESH_SECONDS, offline=False):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.fresh_seconds = fresh_seconds
+        self.offline = offline
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, content_hash TEXT, etag TEXT, last_modified TEXT, "
+                "validated_at REAL, accessed_at REAL)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS page_blobs (content_hash TEXT PRIMARY KEY, body BLOB, size INTEGER)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS pages_accessed_at ON pages (accessed_at)")
+            if not offline:
+                self._conn.execute("DELETE FROM pages WHERE validated_at < ?", (time.time() - self.ttl_seconds,))
+                self._delete_orphan_blobs()
+
+    @classmethod
+    def from_config(cls, config):
+        path = config.get('page_cache_path')
+        if not path:
+            return None
+        return cls(
+            path,
+            ttl_seconds=float(config.get('page_cache_ttl_seconds', DEFAULT_PAGE_CACHE_TTL)),
+            max_bytes=int(config.get('page_cache_max_bytes', DEFAULT_PAGE_CACHE_MAX_BYTES)),
+            fresh_seconds=float(config.get('page_cache_fresh_seconds', DEFAULT_PAGE_CACHE_FRESH_SECONDS)),
+            offline=config.get('page_cache_mode', 'online') == 'offline',
+        )
+
+    @staticmethod
+    def canonical_url(url):
+        url = str(url).split("#")[0].replace("https://in.", "https://www.")
+        if "/jobs/view/" in url:
+            url = url.split("?")[0]
+        elif GUEST_JOB_SEARCH_PATH in url:
+            url = SEARCH_PAGE_VOLATILE_PARAM_PATTERN.sub('', url)
+        return url.rstrip("/")
+
+    def _delete_orphan_blobs(self):
+        self._conn.execute("DELETE FROM page_blobs WHERE content_hash NOT IN (SELECT content_hash FROM pages)")
+
+    def get(self, url):
+        """
+        Returns {'body', 'etag', 'last_modified', 'fresh'} for the cached page, or None.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT page_blobs.body, pages.etag, pages.last_modified, pages.validated_at FROM pages "
+                "JOIN page_blobs ON page_blobs.content_hash = pages.content_hash WHERE pages.url = ?",
+                (self.canonical_url(url),)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (now, self.canonical_url(url)))
+        body, etag, last_modified, validated_at = row
+        return {'body': zlib.decompress(body), 'etag': etag, 'last_modified': last_modified,
+                'fresh': validated_at >= now - self.fresh_seconds}
+
+    def revalidated(self, url):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE pages SET validated_at = ?, accessed_at = ? WHERE url = ?", (now, now, self.canonical_url(url)))
+
+    def put(self, url, body, etag=None, last_modified=None):
+        now = time.time()
+        content_hash = hashlib.sha256(body).hexdigest()
+        with self._lock, self._conn:
+            if self._conn.execute("SELECT 1 FROM page_blobs WHERE content_hash = ?", (content_hash,)).fetchone() is None:
+                compressed = zlib.compress(body)
+                self._conn.execute("INSERT INTO page_blobs (content_hash, body, size) VALUES (?, ?, ?)",
+                                   (content_hash, compressed, len(compressed)))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, content_hash, etag, last_modified, validated_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)", (self.canonical_url(url), content_hash, etag, last_modified, now, now))
+            self._evict()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM page_blobs").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT pages.url, page_blobs.size FROM pages JOIN page_blobs ON page_blobs.content_hash = pages.content_hash "
+            "ORDER BY pages.accessed_at ASC").fetchall()
+        evicted = []
+        for url, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((url,))
+            total -= size
+        self._conn.executemany("DELETE FROM pages WHERE url = ?", evicted)
+        self._delete_orphan_blobs()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class RateLimiter:
+    """
+    Token bucket over both requests and tokens per minute, shared by every thread calling OpenAI. pause() blocks all
+    callers, e.g. for the Retry-After of a 429, and settle() corrects the token estimate with the reported usage.
+    """
+
+    def __init__(self, requests_per_minute=DEFAULT_OPENAI_RPM, tokens_per_minute=DEFAULT_OPENAI_TPM):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            requests_per_minute=max(float(config.get('openai_requests_per_minute', DEFAULT_OPENAI_RPM)), 1),
+            tokens_per_minute=max(float(config.get('openai_tokens_per_minute', DEFAULT_OPENAI_TPM)), 1),
+        )
+
+    def _refill(self, now):
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60)
+        self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60)
+
+    def acquire(self, tokens=0):
+        tokens = min(tokens, self.tokens_per_minute)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._blocked_until - now
+                if wait <= 0:
+                    if self._requests >= 1 and self._tokens >= tokens:
+                        self._requests -= 1
+                        self._tokens -= tokens
+                        return
+                    wait = max((1 - self._requests) * 60 / self.requests_per_minute,
+                               (tokens - self._tokens) * 60 / self.tokens_per_minute)
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def settle(self, estimated_tokens, actual_tokens):
+        with self._lock:
+            self._tokens = min(self.tokens_per_minute, self._tokens + estimated_tokens - actual_tokens)
+
+
+class LlmBatcher:
+    """
+    Collects short job descriptions submitted from the enrich workers and sends them to OpenAI batch_size at a time, or
+    after max_wait seconds, whichever comes first. Each submit returns a Future with that job's extracted details.
+    Every enrich worker waits on its own submit, so batches only fill when enrich_workers is at least batch_size.
+    """
+
+    def __init__(self, source, batch_size=DEFAULT_LLM_BATCH_SIZE, max_wait=DEFAULT_LLM_BATCH_MAX_WAIT,
+                 max_chars=DEFAULT_LLM_BATCH_MAX_CHARS):
+        self.source = source
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.max_chars = max_chars
+        self._pending = {}
+        self._timers = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, source, config):
+        batch_size = int(config.get('llm_batch_size', DEFAULT_LLM_BATCH_SIZE))
+        if batch_size <= 1:
+            return None
+        return cls(
+            source,
+            batch_size=batch_size,
+            max_wait=float(config.get('llm_batch_max_wait', DEFAULT_LLM_BATCH_MAX_WAIT)),
+            max_chars=int(config.get('llm_batch_max_chars', DEFAULT_LLM_BATCH_MAX_CHARS)),
+        )
+
+    def submit(self, jd_text, open_ai_key, model_engine, fields_prompt=EXTRACTION_FIELDS_PROMPT):
+        future = Future()
+        batch_key = (open_ai_key, model_engine, fields_prompt)
+        batch = None
+        with self._lock:
+            pending = self._pending.setdefault(batch_key, [])
+            pending.append((jd_text, future))
+            if len(pending) >= self.batch_size:
+                batch = self._take(batch_key)
+            elif batch_key not in self._timers:
+                timer = threading.Timer(self.max_wait, self.flush, args=(batch_key,))
+                timer.daemon = True
+                self._timers[batch_key] = timer
+                timer.start()
+        if batch:
+            self._send(batch_key, batch)
+        return future
+
+    def _take(self, batch_key):
+        timer = self._timers.pop(batch_key, None)
+        if timer is not None:
+            timer.cancel()
+        return self._pending.pop(batch_key, [])
+
+    def flush(self, batch_key):
+        with self._lock:
+            batch = self._take(batch_key)
+        if batch:
+            self._send(batch_key, batch)
+
+    def _send(self, batch_key, batch):
+        open_ai_key, model_engine, fields_prompt = batch_key
+        try:
+            if len(batch) == 1:
+                results = [self.source.query_job_details(batch[0][0], open_ai_key, model_engine=model_engine, fields_prompt=fields_prompt)]
+            else:
+                results = self.source.query_job_details_batch([jd_text for jd_text, _ in batch], open_ai_key, model_engine=model_engine,
+                                                              fields_prompt=fields_prompt)
+        except Exception as e:
+            logger.info(f"batched extraction failed, retrying {len(batch)} jobs one by one: {str(e)}")
+            results = []
+            for jd_text, _ in batch:
+                try:
+                    results.append(self.source.query_job_details(jd_text, open_ai_key, model_engine=model_engine, fields_prompt=fields_prompt))
+                except Exception:
+                    results.append({})
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+
+class SkillMatcher:
+    """
+    Aho-Corasick matcher over a skill vocabulary. Terms are matched case-insensitively on word boundaries and mapped
+    to one canonical spelling, so "mongo db", "MongoDB" and "mangodb" all report "MongoDB".
+    """
+
+    def __init__(self, vocabulary, aliases=None, stopwords=()):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        aliases = aliases or {}
+        for term in vocabulary:
+            key = self.normalize(term)
+            if not key or key in stopwords:
+                continue
+            self._add(key, aliases.get(key, term.strip().rstrip('.')))
+        for key, canonical in aliases.items():
+            self._add(key, canonical)
+        self._build()
+
+    @staticmethod
+    def normalize(term):
+        return " ".join(str(term).lower().split()).rstrip('.')
+
+    def _add(self, key, canonical):
+        node = 0
+        for char in key:
+            if char not in self._goto[node]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[node][char] = len(self._goto) - 1
+            node = self._goto[node][char]
+        if not any(length == len(key) for length, _ in self._output[node]):
+            self._output[node].append((len(key), canonical))
+
+    def _build(self):
+        # fold the failure links into a full transition table so scanning is a single dict lookup per character
+        self._delta = [dict(self._goto[0])] + [None] * (len(self._goto) - 1)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            fail = self._fail[node]
+            self._delta[node] = dict(self._delta[fail])
+            self._delta[node].update(self._goto[node])
+            self._output[node] = self._output[node] + self._output[fail]
+            for char, child in self._goto[node].items():
+                self._fail[child] = self._delta[fail].get(char, 0)
+                queue.append(child)
+
+    def find(self, text, limit=MAX_PREFERRED_SKILLS):
+        """
+        Returns up to `limit` canonical skills found in text, most frequent first, ties broken by first occurrence.
+        Overlapping matches resolve to the leftmost longest term, so "T-SQL" does not also count as "SQL".
+        """
+        text = " ".join(str(text).lower().split())
+        delta = self._delta
+        output = self._output
+        matches = []
+        node = 0
+        for end, char in enumerate(text):
+            node = delta[node].get(char, 0)
+            if output[node]:
+                for length, canonical in output[node]:
+                    start = end - length + 1
+                    if start > 0 and text[start - 1].isalnum():
+                        continue
+                    if end + 1 < len(text) and text[end + 1].isalnum():
+                        continue
+                    matches.append((start, -length, canonical))
+        counts = {}
+        first_seen = {}
+        covered_until = 0
+        for start, negative_length, canonical in sorted(matches):
+            if start < covered_until:
+                continue
+            covered_until = start - negative_length
+            counts[canonical] = counts.get(canonical, 0) + 1
+            first_seen.setdefault(canonical, start)
+        return sorted(counts, key=lambda skill: (-counts[skill], first_seen[skill]))[:limit]
+
+
+skill_matcher = SkillMatcher(analyst_job_roles, aliases=skill_aliases, stopwords=skill_stopwords)
+
+
+class JobDescriptionCompactor:
+    """
+    Shrinks a job description before it goes into the extraction prompt. Entities and whitespace are normalized,
+    boilerplate sections (About us, EEO statements, ...) and repeated sentences are dropped, and if the rest is still
+    over token_budget the sentences mentioning skills, CTC, experience or contacts are kept first, in their original
+    order. Tokens are estimated at four characters each, as for the OpenAI rate limiter.
+    """
+
+    def __init__(self, token_budget=DEFAULT_JD_TOKEN_BUDGET):
+        self.token_budget = token_budget
+
+    @classmethod
+    def from_config(cls, config):
+        if not config.get('jd_compaction', True):
+            return None
+        return cls(token_budget=max(int(config.get('jd_token_budget', DEFAULT_JD_TOKEN_BUDGET)), 1))
+
+    @staticmethod
+    def estimate_tokens(text):
+        return len(text) // 4
+
+    @staticmethod
+    def is_header(block):
+        return block.endswith(':') or (len(block.split()) <= JD_HEADER_MAX_WORDS and not block.endswith(('.', '!', '?')))
+
+    def sentences(self, jd_text):
+        text = html.unescape(str(jd_text)).replace('\xa0', ' ')
+        in_boilerplate = False
+        seen = set()
+        for block in JD_BLOCK_SPLIT_PATTERN.split(text):
+            block = " ".join(block.split())
+            if not block:
+                continue
+            if self.is_header(block):
+                in_boilerplate = bool(JD_BOILERPLATE_SECTION_PATTERN.match(block))
+            if in_boilerplate:
+                continue
+            for sentence in JD_SENTENCE_SPLIT_PATTERN.split(block):
+                key = sentence.lower()
+                if key in seen or JD_BOILERPLATE_SENTENCE_PATTERN.search(sentence):
+                    continue
+                seen.add(key)
+                yield sentence
+
+    def compact(self, jd_text):
+        """
+        Returns (compacted text, estimated tokens saved).
+        """
+        sentences = list(self.sentences(jd_text))
+        tokens = [self.estimate_tokens(sentence) + 1 for sentence in sentences]
+        if sum(tokens) > self.token_budget:
+            ranked = sorted(range(len(sentences)), key=lambda i: (-len(JD_RELEVANT_PATTERN.findall(sentences[i])), i))
+            kept = set()
+            used = 0
+            for i in ranked:
+                if used + tokens[i] <= self.token_budget:
+                    kept.add(i)
+                    used += tokens[i]
+            sentences = [sentence for i, sentence in enumerate(sentences) if i in kept]
+        compacted = "\n".join(sentences)
+        return compacted, max(self.estimate_tokens(str(jd_text)) - self.estimate_tokens(compacted), 0)
+
+
+class JobPageParser:
+    """
+    Pulls every field read() needs out of a job page, and the card links out of a search page, in one pass. The
+    backend is selectolax or BeautifulSoup over lxml when installed, else BeautifulSoup over html.parser; the
+    BeautifulSoup backends only build the page regions listed in JOB_PAGE_REGION_CLASSES.
+    """
+
+    backends = ('selectolax', 'lxml', 'html.parser')
+
+    def __init__(self, backend=None):
+        if backend is None:
+            backend = 'selectolax' if HTMLParser is not None else 'lxml' if lxml is not None else 'html.parser'
+        if backend not in self.backends:
+            raise ValueError(f"unknown html parser backend {backend}, expected one of {self.backends}")
+        if backend == 'selectolax' and HTMLParser is None or backend == 'lxml' and lxml is None:
+            raise ValueError(f"html parser backend {backend} is not installed")
+        self.backend = backend
+        # class tokens are matched with a regex since the strainer may see the unsplit class attribute
+        self._job_page_strainer = SoupStrainer(class_=self.class_token_pattern(*JOB_PAGE_REGION_CLASSES))
+        self._job_link_strainer = SoupStrainer("a", class_=self.class_token_pattern("base-card__full-link"))
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(backend=config.get('html_parser'))
+
+    @staticmethod
+    def class_token_pattern(*class_names):
+        return re.compile(r'(?:^|\s)(?:' + '|'.join(re.escape(class_name) for class_name in class_names) + r')(?:\s|$)')
+
+    def parse_job_page(self, html):
+        """
+        Returns a dict with job_title (None if absent), company ({} or name/linkedin_url), flavor_bullets,
+        description_html (None if absent) and hr_name ('' if absent).
+        """
+        if self.backend == 'selectolax':
+            return self._parse_job_page_selectolax(html)
+        page = self._parse_job_page_soup(BeautifulSoup(html, self.backend, parse_only=self._job_page_strainer))
+        if page['job_title'] is None and page['description_html'] is None:
+            # unexpected page layout, read the whole document rather than miss fields
+            page = self._parse_job_page_soup(BeautifulSoup(html, self.backend))
+        return page
+
+    @staticmethod
+    def _parse_job_page_soup(soup):
+        page = {'job_title': None, 'company': {}, 'flavor_bullets': [], 'description_html': None, 'hr_name': ''}
+        h3 = soup.find('h3', {'class': HIRING_TEAM_CLASS})
+        if h3:
+            page['hr_name'] = h3.text.strip()
+        h1_tag = soup.find("h1", class_="top-card-layout__title")
+        if h1_tag:
+            page['job_title'] = h1_tag.text
+        for span in soup.find_all("span", class_="topcard__flavor"):
+            a_tag = span.find("a")
+            if a_tag:
+                page['company'] = {'name': a_tag.text.strip(), 'linkedin_url': str(a_tag.get("href")).split("?")[0]}
+        page['flavor_bullets'] = [span.text.strip() for span in soup.find_all("span", class_="topcard__flavor--bullet")]
+        for div in soup.find_all("div", class_="show-more-less-html__markup"):
+            page['description_html'] = div.decode_contents()
+        return page
+
+    @staticmethod
+    def _parse_job_page_selectolax(html):
+        tree = HTMLParser(html)
+        page = {'job_title': None, 'company': {}, 'flavor_bullets': [], 'description_html': None, 'hr_name': ''}
+        for h3 in tree.css('h3.base-main-card__title'):
+            if (h3.attributes.get('class') or '') == HIRING_TEAM_CLASS:
+                page['hr_name'] = h3.text().strip()
+                break
+        h1_tag = tree.css_first("h1.top-card-layout__title")
+        if h1_tag:
+            page['job_title'] = h1_tag.text()
+        for span in tree.css("span.topcard__flavor"):
+            a_tag = span.css_first("a")
+            if a_tag:
+                page['company'] = {'name': a_tag.text().strip(), 'linkedin_url': str(a_tag.attributes.get("href")).split("?")[0]}
+        page['flavor_bullets'] = [span.text().strip() for span in tree.css("span.topcard__flavor--bullet")]
+        for div in tree.css("div.show-more-less-html__markup"):
+            outer_html = div.html
+            page['description_html'] = outer_html[outer_html.index('>') + 1:outer_html.rindex('<')]
+        return page
+
+    def parse_job_links(self, html):
+        if self.backend == 'selectolax':
+            anchors = [a.attributes.get('href') for a in HTMLParser(html).css("a.base-card__full-link")]
+        else:
+            anchors = [a.get('href') for a in BeautifulSoup(html, self.backend, parse_only=self._job_link_strainer).find_all("a")]
+        return {href.split("?")[0] for href in anchors if href}
+
+
+def dumps_json(value):
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(value, separators=(',', ':'), default=str)
+
+
+class RecordEmitter:
+    """
+    Emission path for records. Companies and recruiters already emitted in this sync are dropped, emitted_at is read
+    once per second instead of once per record and messages are built without re-validating the data. In 'stdout' mode
+    records are serialized with orjson when available and written to stdout batch_size at a time instead of being
+    yielded; flush() must run before anything else is yielded so records still precede the state that covers them.
+    """
+
+    def __init__(self, mode=DEFAULT_EMIT_MODE, batch_size=DEFAULT_EMIT_BATCH_SIZE, stream=None, metrics=None):
+        self.mode = mode
+        self.batch_size = batch_size
+        self.stream = stream or sys.stdout
+        self.metrics = metrics or Metrics()
+        self._seen = {'companies': set(), 'recruiter_details': set()}
+        self._buffer = []
+        self._second = None
+        self._emitted_at = 0
+
+    @classmethod
+    def from_config(cls, config, metrics=None):
+        mode = config.get('emit_mode', DEFAULT_EMIT_MODE)
+        if mode not in ('messages', 'stdout'):
+            raise ValueError(f"emit_mode must be 'messages' or 'stdout', got {mode!r}")
+        return cls(mode=mode, batch_size=max(int(config.get('emit_batch_size', DEFAULT_EMIT_BATCH_SIZE)), 1), metrics=metrics)
+
+    @staticmethod
+    def dedup_key(stream_name, data):
+        if stream_name == 'companies':
+            return data.get('linkedin_url') or data.get('name')
+        if stream_name == 'recruiter_details' and data.get('name'):
+            return data['name'], data.get('company')
+        return None
+
+    def emitted_at(self):
+        now = time.time()
+        if int(now) != self._second:
+            self._second = int(now)
+            self._emitted_at = int(now) * 1000
+        return self._emitted_at
+
+    def emit(self, stream_name, data):
+        """
+        Returns the message to yield for a record, or None when it is a duplicate or was buffered for stdout.
+        """
+        key = self.dedup_key(stream_name, data)
+        if key is not None:
+            seen = self._seen[stream_name]
+            if key in seen:
+                self.metrics.increment('records_deduplicated')
+                return None
+            seen.add(key)
+        self.metrics.increment('records_emitted')
+        if self.mode == 'stdout':
+            self._buffer.append(dumps_json({'type': 'RECORD', 'record': {'stream': stream_name, 'data': data,
+                                                                          'emitted_at': self.emitted_at()}}))
+            if len(self._buffer) >= self.batch_size:
+                self.flush()
+            return None
+        return AirbyteMessage.construct(
+            type=Type.RECORD,
+            record=AirbyteRecordMessage.construct(stream=stream_name, data=data, emitted_at=self.emitted_at()),
+        )
+
+    def flush(self):
+        if not self._buffer:
+            return
+        self.stream.write("\n".join(self._buffer) + "\n")
+        self.stream.flush()
+        self._buffer = []
+
+
+class SearchMatrix:
+    """
+    The search cells every role is searched in: the cartesian product of the locations, job types, recency windows and
+    seniority levels of each configured matrix, without repeated cells. Dimensions a matrix leaves out keep the sync's
+    defaults (India, full time, past_time, entry level). Up to parallelism cells are searched at a time, each paging
+    with at most cell_parallelism requests in flight.
+    """
+
+    def __init__(self, cells, parallelism=DEFAULT_MATRIX_PARALLELISM, cell_parallelism=None):
+        self.cells = cells
+        self.parallelism = parallelism
+        self.cell_parallelism = cell_parallelism
+
+    @classmethod
+    def from_config(cls, config):
+        defaults = {
+            'location': DEFAULT_SEARCH_LOCATION,
+            'job_type': DEFAULT_SEARCH_JOB_TYPE,
+            'past_time': config.get('past_time', DEFAULT_PAST_TIME),
+            'job_level': DEFAULT_SEARCH_JOB_LEVEL,
+        }
+        matrices = config.get('search_matrix') or [{}]
+        if isinstance(matrices, dict):
+            matrices = [matrices]
+        cells = []
+        for matrix in matrices:
+            unknown = sorted(set(matrix) - set(SEARCH_MATRIX_DIMENSIONS))
+            if unknown:
+                raise ValueError(f"unknown search_matrix dimensions {unknown}, expected some of {list(SEARCH_MATRIX_DIMENSIONS)}")
+            values = [cls.dimension_values(dimension, matrix.get(dimension, defaults[dimension])) for dimension in SEARCH_MATRIX_DIMENSIONS]
+            for combination in itertools.product(*values):
+                cell = dict(zip(SEARCH_MATRIX_DIMENSIONS, combination))
+                if cell not in cells:
+                    cells.append(cell)
+        cell_parallelism = config.get('matrix_cell_parallelism')
+        return cls(
+            cells,
+            parallelism=max(int(config.get('matrix_parallelism', DEFAULT_MATRIX_PARALLELISM)), 1),
+            cell_parallelism=max(int(cell_parallelism), 1) if cell_parallelism else None,
+        )
+
+    @staticmethod
+    def dimension_values(dimension, values):
+        values = [values] if isinstance(values, str) else list(values)
+        keys = {'job_type': job_type_keys, 'past_time': past_time_keys, 'job_level': job_level_keys}.get(dimension)
+        for value in values:
+            if keys is None or value in keys or (dimension == 'past_time' and PAST_TIME_WINDOW_PATTERN.fullmatch(value)):
+                continue
+            raise ValueError(f"unknown {dimension} {value!r} in search_matrix, expected one of {list(keys)}")
+        return values
+
+
+class QueryPlanner:
+    """
+    Folds the roles of a sync into fewer LinkedIn searches. Roles are normalized (case, punctuation, "React.js" vs
+    "React Js", "Front-End" vs "Frontend") and roles with the same normalized form make up a cluster. Clusters are then
+    packed into '"A" OR "B" OR "C"' keyword queries of at most max_terms terms, those ending in the same word (developer,
+    engineer, analyst, ...) next to each other; a cluster is never split across queries. Postings found by a query are
+    mapped back to the cluster whose normalized role best matches the title in the job link.
+    """
+
+    def __init__(self, enabled=True, max_terms=DEFAULT_QUERY_MAX_TERMS):
+        self.enabled = enabled
+        self.max_terms = max_terms
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            enabled=bool(config.get('query_planning', True)),
+            max_terms=max(int(config.get('query_max_terms', DEFAULT_QUERY_MAX_TERMS)), 1),
+        )
+
+    @staticmethod
+    def normalize(job_role):
+        text = ROLE_SEPARATOR_PATTERN.sub(' ', unquote(job_role).lower())
+        text = ROLE_JS_SUFFIX_PATTERN.sub('', text)
+        for pattern, replacement in ROLE_SPELLING_PATTERNS:
+            text = pattern.sub(replacement, text)
+        return " ".join(text.split())
+
+    @staticmethod
+    def keywords(job_roles):
+        if len(job_roles) == 1:
+            return job_roles[0]
+        terms = list(dict.fromkeys(unquote(job_role) for job_role in job_roles))
+        return quote(" OR ".join(f'"{term}"' for term in terms), safe='')
+
+    @staticmethod
+    def search_roles(search):
+        return [job_role for job_roles in search['clusters'].values() for job_role in job_roles]
+
+    def plan(self, job_roles):
+        """
+        Returns the searches covering job_roles as dicts of the 'keywords' to search and the role 'clusters' (normalized
+        role to roles) they were planned for. Without planning every role is searched on its own, as configured.
+        """
+        if not self.enabled:
+            return [{'keywords': job_role, 'clusters': {self.normalize(job_role): [job_role]}} for job_role in job_roles]
+        clusters = {}
+        for job_role in dict.fromkeys(job_roles):
+            clusters.setdefault(self.normalize(job_role), []).append(job_role)
+        families = {}
+        for key in clusters:
+            families.setdefault(key.rsplit(' ', 1)[-1], []).append(key)
+        searches = []
+        terms = 0
+        for key in (key for keys in families.values() for key in keys):
+            if not searches or terms + len(clusters[key]) > self.max_terms:
+                searches.append({'clusters': {}})
+                terms = 0
+            searches[-1]['clusters'][key] = clusters[key]
+            terms += len(clusters[key])
+        for search in searches:
+            search['keywords'] = self.keywords(self.search_roles(search))
+        return searches
+
+    def attribute(self, search, jd_link):
+        """
+        Returns the roles of the cluster the posting at jd_link was found for, judged by the title in the link's slug.
+        Links without a usable slug go to the search's first cluster.
+        """
+        clusters = search['clusters']
+        if len(clusters) == 1:
+            return next(iter(clusters.values()))
+        slug = urlparse(jd_link).path.rstrip('/').rsplit('/', 1)[-1]
+        title = set(self.normalize(JOB_ID_PATTERN.sub('', slug).partition('-at-')[0]).split())
+        best = max(clusters, key=lambda key: len(title & set(key.split())) / max(len(title | set(key.split())), 1))
+        return clusters[best]
+
+
+class RoleScheduler:
+    """
+    Orders the searches of a sync by expected new postings per second of discovery, from per-role statistics kept in
+    the role cursors across syncs: smoothed new postings per run, discovery seconds and discovery error rate. Searches
+    with a role that has no statistics yet go first. A role finding nothing new backoff_after runs in a row is skipped
+    for backoff_seconds, doubling with every further empty run up to backoff_max_seconds. With a time_budget no search
+    is started once the budget is spent, searches already started still finish.
+    """
+
+    def __init__(self, enabled=True, backoff_after=DEFAULT_ROLE_BACKOFF_AFTER, backoff_seconds=DEFAULT_ROLE_BACKOFF_SECONDS,
+                 backoff_max_seconds=DEFAULT_ROLE_BACKOFF_MAX_SECONDS, time_budget=None):
+        self.enabled = enabled
+        self.backoff_after = backoff_after
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.time_budget = time_budget
+
+    @classmethod
+    def from_config(cls, config):
+        time_budget = config.get('time_budget_seconds')
+        return cls(
+            enabled=bool(config.get('role_scheduling', True)),
+            backoff_after=max(int(config.get('role_backoff_after', DEFAULT_ROLE_BACKOFF_AFTER)), 1),
+            backoff_seconds=float(config.get('role_backoff_seconds', DEFAULT_ROLE_BACKOFF_SECONDS)),
+            backoff_max_seconds=float(config.get('role_backoff_max_seconds', DEFAULT_ROLE_BACKOFF_MAX_SECONDS)),
+            time_budget=float(time_budget) if time_budget else None,
+        )
+
+    def is_due(self, stats, now):
+        return not self.enabled or not stats or stats.get('next_due_at', 0) <= now
+
+    @staticmethod
+    def priority(search, role_stats):
+        stats = [role_stats.get(job_role) for job_role in QueryPlanner.search_roles(search)]
+        if not all(stats):
+            return float('inf')
+        new_jobs = sum(role['new_jobs'] * (1 - role['error_rate']) for role in stats)
+        return new_jobs / max(sum(role['discovery_seconds'] for role in stats), ROLE_MIN_DISCOVERY_SECONDS)
+
+    def order(self, searches, role_stats):
+        if not self.enabled:
+            return searches
+        return sorted(searches, key=lambda search: self.priority(search, role_stats), reverse=True)
+
+    def within_budget(self, searches):
+        """
+        Yields the searches until the time budget, counted from the first one, is spent.
+        """
+        deadline = time.monotonic() + self.time_budget if self.time_budget else None
+        for i, search in enumerate(searches):
+            if deadline is not None and time.monotonic() >= deadline:
+                logger.info(f"time budget of {self.time_budget}s spent, {len(searches) - i} searches left for the next sync")
+                return
+            yield search
+
+    def record(self, stats, new_jobs, discovery_seconds, failed, now):
+        """
+        Returns the role's statistics updated with one run. Failed runs count towards the error rate, not the backoff.
+        """
+        stats = stats or {}
+        run = {'new_jobs': new_jobs, 'discovery_seconds': discovery_seconds, 'error_rate': float(failed)}
+        if stats:
+            run = {key: stats[key] + ROLE_STATS_SMOOTHING * (value - stats[key]) for key, value in run.items()}
+        if new_jobs:
+            unproductive_runs = 0
+        else:
+            unproductive_runs = stats.get('unproductive_runs', 0) + (0 if failed else 1)
+        next_due_at = 0
+        if unproductive_runs >= self.backoff_after:
+            doublings = min(unproductive_runs - self.backoff_after, ROLE_BACKOFF_MAX_DOUBLINGS)
+            next_due_at = int(now + min(self.backoff_seconds * 2 ** doublings, self.backoff_max_seconds))
+        return {key: round(value, 4) for key, value in run.items()} | {
+            'runs': stats.get('runs', 0) + 1,
+            'unproductive_runs': unproductive_runs,
+            'next_due_at': next_due_at,
+        }
+
+
+class JobPipeline:
+    """
+    Runs a sync as stages connected by bounded queues: a discovery thread streaming job links up to discovery_ahead
+    roles ahead, a fetch pool downloading and parsing job pages and an enrich pool running the LLM extraction. Jobs are
+    fetched as soon as discovery yields them and at most max_in_flight jobs sit between discovery and emission, so
+    memory stays flat however many roles are configured. Events come out in the same order a sequential sync would
+    produce them.
+    """
+
+    _discovery_done = object()
+
+    def __init__(self, fetch_workers=DEFAULT_MAX_WORKERS, enrich_workers=DEFAULT_MAX_WORKERS, max_in_flight=None,
+                 discovery_ahead=DEFAULT_DISCOVERY_AHEAD, metrics=None):
+        self.fetch_workers = fetch_workers
+        self.enrich_workers = enrich_workers
+        self.max_in_flight = max_in_flight or PIPELINE_IN_FLIGHT_PER_WORKER * max(fetch_workers, enrich_workers)
+        self.discovery_ahead = discovery_ahead
+        self.metrics = metrics or Metrics()
+
+    @classmethod
+    def from_config(cls, config, metrics=None):
+        max_workers = max(int(config.get('max_workers', DEFAULT_MAX_WORKERS)), 1)
+        return cls(
+            fetch_workers=max(int(config.get('fetch_workers', max_workers)), 1),
+            enrich_workers=max(int(config.get('enrich_workers', max_workers)), 1),
+            max_in_flight=config.get('pipeline_max_in_flight'),
+            discovery_ahead=max(int(config.get('discovery_ahead', DEFAULT_DISCOVERY_AHEAD)), 1),
+            metrics=metrics,
+        )
+
+    @staticmethod
+    def _put(bounded_queue, item, stop):
+        while not stop.is_set():
+            try:
+                bounded_queue.put(item, timeout=SCROLL_POLL_INTERVAL)
+                return
+            except queue.Full:
+                continue
+
+    def _discover_roles(self, roles, discover, discovered, roles_ahead, stop):
+        try:
+            roles = iter(roles)
+            while True:
+                while not roles_ahead.acquire(timeout=SCROLL_POLL_INTERVAL):
+                    if stop.is_set():
+                        return
+                # the next role is only taken once it can start, so a lazy roles iterable decides as late as possible
+                role = next(roles, self._discovery_done)
+                if role is self._discovery_done or stop.is_set():
+                    return
+                context, jobs = discover(role)
+                self._put(discovered, ('role_started', role, context), stop)
+                try:
+                    for job in jobs:
+                        if stop.is_set():
+                            return
+                        self._put(discovered, ('job', job), stop)
+                finally:
+                    if hasattr(jobs, 'close'):
+                        jobs.close()
+                self._put(discovered, ('role_done', role, context), stop)
+        except BaseException as e:
+            self._put(discovered, e, stop)
+        finally:
+            self._put(discovered, self._discovery_done, stop)
+
+    def run(self, roles, discover, fetch, enrich):
+        """
+        discover(role) returns (context, jobs) where jobs may be a generator, fetch(job) runs on the fetch pool and
+        enrich(job, fetched) on the enrich pool, returning the job's records. Yields ('role_started', role, context), then
+        ('records', enriched) with what enrich returned for each job and ('role_done', role, context) once all of the
+        role's records have been yielded. The context is passed on as is, so discover can fill it in while its jobs are consumed.
+        """
+        discovered = queue.Queue(maxsize=self.max_in_flight)
+        roles_ahead = threading.Semaphore(self.discovery_ahead)
+        stop = threading.Event()
+        discovery = threading.Thread(target=self._discover_roles, args=(roles, discover, discovered, roles_ahead, stop),
+                                     name='discovery', daemon=True)
+        fetch_executor = ThreadPoolExecutor(max_workers=self.fetch_workers, thread_name_prefix='jd-fetch')
+        enrich_executor = ThreadPoolExecutor(max_workers=self.enrich_workers, thread_name_prefix='jd-enrich')
+        pending = deque()
+        in_flight = 0
+        discovery_done = False
+
+        def fetch_then_enrich(job):
+            return enrich_executor.submit(enrich, job, fetch(job))
+
+        def head_ready():
+            event = pending[0]
+            if event[0] != 'job':
+                return True
+            return event[1].done() and (event[1].exception() is not None or event[1].result().done())
+
+        def next_event():
+            nonlocal in_flight
+            event = pending.popleft()
+            if event[0] == 'job':
+                in_flight -= 1
+                self.metrics.set_gauge('pipeline_in_flight', in_flight)
+                return 'records', event[1].result().result()
+            return event
+
+        discovery.start()
+        try:
+            while not discovery_done or pending:
+                if pending and (discovery_done or in_flight >= self.max_in_flight or head_ready()):
+                    yield next_event()
+                    continue
+                try:
+                    item = discovered.get(timeout=PIPELINE_POLL_INTERVAL) if pending else discovered.get()
+                except queue.Empty:
+                    continue
+                if item is self._discovery_done:
+                    discovery_done = True
+                elif isinstance(item, BaseException):
+                    raise item
+                elif item[0] == 'job':
+                    pending.append(('job', fetch_executor.submit(fetch_then_enrich, item[1])))
+                    in_flight += 1
+                    self.metrics.set_gauge('pipeline_in_flight', in_flight)
+                else:
+                    pending.append(item)
+                    if item[0] == 'role_done':
+                        roles_ahead.release()
+        finally:
+            stop.set()
+            fetch_executor.shutdown(wait=True, cancel_futures=True)
+            enrich_executor.shutdown(wait=True, cancel_futures=True)
+            discovery.join()
+
+
 class SourceLinkedinJobScrapper(Source):
-    driver = None
+
+    def __init__(self, http_client: HttpClient = None, driver_pool: DriverPool = None):
+        super().__init__()
+        self._http_client = http_client
+        self._driver_pool = driver_pool
+        self.job_index = JobIndex()
+        self.llm_cache = LlmCache()
+        self.page_cache = None
+        self.near_duplicates = None
+        self.linkedin_throttle = HostThrottle()
+        self.openai_limiter = RateLimiter()
+        self.llm_batcher = None
+        self.skill_matcher = skill_matcher
+        self.local_skills_min_terms = DEFAULT_LOCAL_SKILLS_MIN_TERMS
+        self.jd_compactor = JobDescriptionCompactor()
+        self.structured_output = True
+        self.html_parser = JobPageParser()
+        self.linkedin_base_url = LINKEDIN_BASE_URL
+        self.openai_base_url = OPENAI_BASE_URL
+        self.metrics = Metrics()
+
+    @property
+    def http_client(self) -> HttpClient:
+        if self._http_client is None:
+            self._http_client = HttpClient()
+        return self._http_client
+
+    @property
+    def driver_pool(self) -> DriverPool:
+        if self._driver_pool is None:
+            self._driver_pool = DriverPool()
+        return self._driver_pool
+
     def check(self, logger: AirbyteLogger, config: json) -> AirbyteConnectionStatus:
         """
         Tests if the input configuration can be used to successfully connect to the integration
@@ -90,541 +2111,937 @@ class SourceLinkedinJobScrapper(Source):
 
         return AirbyteCatalog(streams=stream_schema)
 
+    def fetch_page(self, url):
+        """
+        Fetches a job page, revalidating a cached copy with If-None-Match / If-Modified-Since when a page cache is set.
+        """
+        cached = self.page_cache.get(url) if self.page_cache is not None else None
+        if cached is not None and (cached['fresh'] or self.page_cache.offline):
+            self.metrics.increment('page_cache_hits')
+            return cached['body']
+        if self.page_cache is not None and self.page_cache.offline:
+            raise LookupError(f"{url} is not in the page cache and page_cache_mode is offline")
+        headers = {}
+        if cached is not None:
+            if cached['etag']:
+                headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                headers['If-Modified-Since'] = cached['last_modified']
+        with self.metrics.timer('fetch'):
+            response = self.linkedin_get(url, headers=headers)
+        if cached is not None and response.status_code == 304:
+            self.metrics.increment('page_cache_revalidated')
+            self.page_cache.revalidated(url)
+            return cached['body']
+        if self.page_cache is not None and response.status_code == 200:
+            self.page_cache.put(url, response.content, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        return response.content
+
     @staticmethod
-    def create_soup(url):
-        response = requests.get(url)
-        soup = BeautifulSoup(response.content, "html.parser")
-        return soup
+    def is_block_page(response):
+        if response.status_code in BLOCK_STATUS_CODES:
+            return True
+        if any(marker in str(response.url) for marker in BLOCK_URL_MARKERS):
+            return True
+        return response.status_code == 200 and any(marker in response.content for marker in BLOCK_PAGE_MARKERS)
 
-    def infinite_scroll(self, url, scroll_times, button_class_name, driver_required=True):
-        if driver_required:
-            self.driver.get(url)
-        time.sleep(2)
-        scroll_times = scroll_times
-        for i in range(scroll_times):
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+    def linkedin_get(self, url, **kwargs):
+        """
+        GETs a LinkedIn URL through the per-host throttle. Throttled responses and block pages are retried once the
+        throttle's pause is over instead of being parsed as job pages.
+        """
+        host = urlparse(url).netloc
+        for attempt in range(LINKEDIN_MAX_RETRIES + 1):
+            self.linkedin_throttle.acquire(host)
+            started_at = time.monotonic()
+            response = None
+            blocked = False
             try:
-                if driver_required:
-                    button = WebDriverWait(self.driver, 0).until(
-                        EC.presence_of_element_located((By.CLASS_NAME, button_class_name)))
-                    button.click()
-                else:
-                    button = WebDriverWait(self.driver, 0).until(EC.element_to_be_clickable((By.CLASS_NAME, button_class_name)))
-                    button.click()
-            except:
-                pass
-            time.sleep(1)
+                response = self.http_client.get(url, **kwargs)
+                blocked = self.is_block_page(response)
+            finally:
+                retry_after = None
+                if blocked and (response.headers.get('retry-after') or response.headers.get('retry-after-ms')):
+                    retry_after = self.get_retry_after(response, attempt)
+                self.linkedin_throttle.release(host, throttled=blocked, latency=time.monotonic() - started_at, retry_after=retry_after,
+                                               failed=response is None)
+            if not blocked:
+                return response
+        raise Exception(f"{url} is still blocked after {LINKEDIN_MAX_RETRIES} retries (status {response.status_code})")
 
-        html = self.driver.page_source
-        if driver_required:
-            self.driver.close()
-        return html
+    @staticmethod
+    def scroll_job_links(driver, url, button_class_name, card_selector=JOB_CARD_SELECTOR, max_cards=DEFAULT_DISCOVERY_MAX_RESULTS,
+                         step_timeout=DEFAULT_SCROLL_STEP_TIMEOUT, driver_required=True):
+        """
+        Scrolls until the result list stops growing or holds max_cards cards. Each step waits only as long as it takes
+        for new cards to render or for the show-more button to become clickable, bounded by step_timeout. After every
+        step only the hrefs of the newly rendered cards are read from the browser and yielded as a list, so links flow
+        downstream while scrolling continues and the page source is never pulled.
+        """
+        def card_count(d):
+            return len(d.find_elements(By.CSS_SELECTOR, card_selector))
+
+        def clickable_show_more(d):
+            buttons = d.find_elements(By.CLASS_NAME, button_class_name)
+            if buttons and buttons[0].is_displayed() and buttons[0].is_enabled():
+                return buttons[0]
+            return False
 
-    def get_scroll_time_count(self, url, tag_name, class_name, denominator):
+        harvested = 0
+
+        def new_links():
+            nonlocal harvested
+            count, hrefs = driver.execute_script(HARVEST_JOB_LINKS_SCRIPT, card_selector, harvested)
+            hrefs = hrefs[:max(max_cards - harvested, 0)]
+            harvested = min(count, max_cards)
+            return [href.split("?")[0] for href in hrefs]
+
+        if driver_required:
+            driver.get(url)
         try:
-            soup = self.create_soup(url)
-            tag = soup.find('span', class_='results-context-header__job-count')
-            # print("Tag New", soup.find_all('span'))
-            print("tag", tag, url)
-            results_text = tag.text
-            numeric_part = re.findall(r'\d+', results_text)[0]
-            if int(numeric_part) == 1:
-                tag2 = soup.find(tag_name, class_='results-context-header__new-jobs')
-                results_text2 = tag2.text
-                results_text2 = results_text2.replace(',', '')
-                numeric_part2 = re.findall(r'\d+', results_text2)[0]
-                return int(int(numeric_part2) / denominator)
-            return int(int(numeric_part) / denominator)
-        except:
-            return 1
+            WebDriverWait(driver, step_timeout).until(EC.presence_of_element_located((By.CSS_SELECTOR, card_selector)))
+        except TimeoutException:
+            return
+        yield new_links()
+
+        while harvested < max_cards:
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            try:
+                outcome = WebDriverWait(driver, step_timeout, poll_frequency=SCROLL_POLL_INTERVAL).until(
+                    lambda d: card_count(d) > harvested or clickable_show_more(d))
+                if outcome is not True:
+                    outcome.click()
+                    WebDriverWait(driver, step_timeout, poll_frequency=SCROLL_POLL_INTERVAL).until(lambda d: card_count(d) > harvested)
+            except (TimeoutException, WebDriverException):
+                break
+            yield new_links()
+
+    @staticmethod
+    def build_search_url(base_url, payload):
+        final_url = base_url
+        for key, val in payload.items():
+            final_url += f"{key}={val}&"
+        return final_url
+
+    def get_guest_search_page(self, search_url, start):
+        page_url = f"{search_url}start={start}"
+        if self.page_cache is not None and self.page_cache.offline:
+            cached = self.page_cache.get(page_url)
+            if cached is None:
+                raise Exception(f"guest job search for start={start} is not in the page cache")
+            return self.html_parser.parse_job_links(cached['body'])
+        with self.metrics.timer('discovery_page'):
+            response = self.linkedin_get(page_url)
+        if response.status_code != 200:
+            raise Exception(f"guest job search returned {response.status_code} for start={start}")
+        if self.page_cache is not None:
+            # search results are only kept for offline replay and never revalidated, each run overwrites the last
+            self.page_cache.put(page_url, response.content)
+        return self.html_parser.parse_job_links(response.content)
+
+    def get_jd_links_over_http(self, payload, parallelism=DEFAULT_DISCOVERY_PARALLELISM, max_results=DEFAULT_DISCOVERY_MAX_RESULTS):
+        """
+        Reads the paginated guest job-search fragments by offset, a wave of `parallelism` pages at a time, until a page
+        comes back empty or max_results is reached. The links of each wave are yielded as soon as it completes.
+        """
+        search_url = self.build_search_url(self.linkedin_base_url + GUEST_JOB_SEARCH_PATH, payload)
+        offsets = list(range(0, max_results, GUEST_JOB_SEARCH_PAGE_SIZE))
+        with ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix='jd-discovery') as executor:
+            for wave_start in range(0, len(offsets), parallelism):
+                wave = offsets[wave_start:wave_start + parallelism]
+                pages = list(executor.map(lambda start: self.get_guest_search_page(search_url, start), wave))
+                for page_links in pages:
+                    yield from page_links
+                if not all(pages):
+                    break
+
+    def get_jd_links_with_driver(self, payload, max_cards=DEFAULT_DISCOVERY_MAX_RESULTS, step_timeout=DEFAULT_SCROLL_STEP_TIMEOUT):
+        final_url = self.build_search_url(self.linkedin_base_url + JOB_SEARCH_PATH, payload)
+        with self.driver_pool.driver() as driver, self.metrics.timer('scroll'):
+            for jd_links in self.scroll_job_links(driver, final_url, button_class_name="infinite-scroller__show-more-button--visible",
+                                                  max_cards=max_cards, step_timeout=step_timeout):
+                yield from jd_links
 
     def get_all_jobs_jd_links(self, job_role="Software%20Engineer", location="India", job_type="full_time", past_time="day",
-                              job_level="entry_level"):
-        jd_links = set()
-        job_search_base_url = "https://www.linkedin.com/jobs/search?"
-        final_url = job_search_base_url
+                              job_level="entry_level", discovery_mode=DEFAULT_DISCOVERY_MODE,
+                              discovery_parallelism=DEFAULT_DISCOVERY_PARALLELISM, max_results=DEFAULT_DISCOVERY_MAX_RESULTS,
+                              scroll_step_timeout=DEFAULT_SCROLL_STEP_TIMEOUT):
+        """
+        Yields the job links of the search, without duplicates, as discovery finds them. If HTTP discovery fails or finds
+        nothing, Selenium takes over and only links not yielded yet are passed on; in offline page cache mode there is no
+        fallback.
+        """
         payload = {
             "keywords": job_role,
             "location": location,
             "f_JT": job_type_keys[job_type],
-            "f_TPR": past_time_keys[past_time],
+            "f_TPR": past_time_keys.get(past_time, past_time),
             "f_E": job_level_keys[job_level]
         }
 
-        for key, val in payload.items():
-            final_url += f"{key}={val}&"
-        scroll_times = self.get_scroll_time_count(final_url, tag_name='span', class_name="results-context-header__job-count",
-                                                  denominator=25)
-        html = self.infinite_scroll(final_url, scroll_times, button_class_name="infinite-scroller__show-more-button--visible")
+        harvested = set()
+        # offline replay only has the cached guest search pages, Selenium would search live LinkedIn
+        offline = self.page_cache is not None and self.page_cache.offline
+        if discovery_mode == 'http' or offline:
+            try:
+                for jd_link in self.get_jd_links_over_http(payload, parallelism=discovery_parallelism, max_results=max_results):
+                    if jd_link not in harvested:
+                        harvested.add(jd_link)
+                        yield jd_link
+                if harvested or offline:
+                    return
+                logger.info(f"http discovery found no jobs for {job_role}, falling back to selenium")
+            except Exception as e:
+                if offline:
+                    raise
+                logger.info(f"http discovery failed for {job_role}, falling back to selenium: {str(e)}")
+            self.metrics.increment('discovery_selenium_fallbacks')
+        for jd_link in self.get_jd_links_with_driver(payload, max_cards=max_results, step_timeout=scroll_step_timeout):
+            if jd_link not in harvested:
+                harvested.add(jd_link)
+                yield jd_link
 
-        soup = BeautifulSoup(html, 'html.parser')
-        ul_tag = soup.find("ul", class_="jobs-search__results-list")
-        li_tags = ul_tag.find_all("li")
+    def get_search_matrix_jd_links(self, job_role, cells, parallelism=DEFAULT_MATRIX_PARALLELISM, **discovery_options):
+        """
+        Yields (job link, cell) for job_role over all search cells, each posting once however many cells find it, with
+        the first cell that found it. Up to parallelism cells are searched at a time and their links are passed on as
+        they arrive. A failing cell does not stop the others; its error is raised once they are done.
+        """
+        if len(cells) == 1:
+            for jd_link in self.get_all_jobs_jd_links(job_role=job_role, **cells[0], **discovery_options):
+                yield jd_link, cells[0]
+            return
+        found = queue.Queue(maxsize=SEARCH_CELL_QUEUE_SIZE)
+        stop = threading.Event()
+        cell_done = object()
 
-        for li in li_tags:
-            a_tags = li.find_all("a")
-            for a in a_tags:
-                if "base-card__full-link" in a.get("class", []):
-                    jd_links.add(a['href'].split("?")[0])
-        return jd_links
+        def put(item):
+            while not stop.is_set():
+                try:
+                    found.put(item, timeout=SCROLL_POLL_INTERVAL)
+                    return
+                except queue.Full:
+                    continue
+
+        def search_cell(cell):
+            try:
+                for jd_link in self.get_all_jobs_jd_links(job_role=job_role, **cell, **discovery_options):
+                    if stop.is_set():
+                        return
+                    put((jd_link, cell))
+            except Exception as e:
+                logger.info(f"discovery failed for {job_role} in {cell}: {str(e)}")
+                self.metrics.increment('discovery_cell_errors')
+                put(e)
+            finally:
+                put(cell_done)
+
+        executor = ThreadPoolExecutor(max_workers=min(parallelism, len(cells)), thread_name_prefix='search-cell')
+        job_ids = set()
+        error = None
+        try:
+            for cell in cells:
+                executor.submit(search_cell, cell)
+            remaining = len(cells)
+            while remaining:
+                item = found.get()
+                if item is cell_done:
+                    remaining -= 1
+                elif isinstance(item, Exception):
+                    error = error or item
+                elif JobIndex.job_id(item[0]) not in job_ids:
+                    job_ids.add(JobIndex.job_id(item[0]))
+                    yield item
+        finally:
+            stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+        if error is not None:
+            raise error
 
     @staticmethod
-    def create_open_ai_query(input_query, OPENAI_API_KEY, model_engine='gpt-3.5-turbo', temperature=0):
-        openai_url = f"https://api.openai.com/v1/chat/completions"
+    def get_discovery_options(config):
+        return {
+            'discovery_mode': config.get('discovery_mode', DEFAULT_DISCOVERY_MODE),
+            'discovery_parallelism': max(int(config.get('discovery_parallelism', DEFAULT_DISCOVERY_PARALLELISM)), 1),
+            'max_results': max(int(config.get('discovery_max_results', DEFAULT_DISCOVERY_MAX_RESULTS)), 1),
+            'scroll_step_timeout': float(config.get('scroll_step_timeout', DEFAULT_SCROLL_STEP_TIMEOUT)),
+        }
+
+    def create_open_ai_query(self, input_query, OPENAI_API_KEY, model_engine='gpt-3.5-turbo', temperature=0, max_tokens=150,
+                             messages=None, json_mode=False):
+        openai_url = f"{self.openai_base_url}/v1/chat/completions"
         headers = {'Authorization': f'Bearer {OPENAI_API_KEY}', 'Content-Type': 'application/json'}
+        messages = messages or [{"role": "user", "content": input_query}]
         payload = {
             'model': model_engine,
-            'messages': [{"role": "user", "content": input_query}],
+            'messages': messages,
             'temperature': temperature,
-            'max_tokens': 150
+            'max_tokens': max_tokens
         }
-        response = requests.post(openai_url, headers=headers, data=json.dumps(payload))
+        if json_mode:
+            payload['response_format'] = {'type': 'json_object'}
+        estimated_tokens = sum(len(message['content']) for message in messages) // 4 + max_tokens
+        for attempt in range(OPENAI_MAX_RETRIES + 1):
+            self.openai_limiter.acquire(estimated_tokens)
+            with self.metrics.timer('llm_request'):
+                response = self.http_client.post(openai_url, headers=headers, data=json.dumps(payload))
+            self.metrics.increment('llm_requests')
+            if response.status_code != 429 or attempt == OPENAI_MAX_RETRIES:
+                break
+            self.metrics.increment('llm_throttled')
+            self.openai_limiter.pause(self.get_retry_after(response, attempt))
         if response.status_code == 200 and 'choices' in response.json():
-            content_text = response.json()['choices'][0]['message']['content'].strip()
-            return {"success": True, "data": content_text, "response_json": response.json()}
+            response_json = response.json()
+            self.openai_limiter.settle(estimated_tokens, response_json.get('usage', {}).get('total_tokens', estimated_tokens))
+            content_text = response_json['choices'][0]['message']['content'].strip()
+            return {"success": True, "data": content_text, "response_json": response_json}
         return {"success": False, "error": response.text}
 
     @staticmethod
-    def validate_and_send_correct_evaluation_response(text_response):
-        text_response = str(text_response).replace('\n', '')
-        text_response = str(text_response).replace('null', '')
-        evaluation_json = eval(text_response)
-        return evaluation_json
+    def get_retry_after(response, attempt):
+        try:
+            if response.headers.get('retry-after-ms'):
+                return float(response.headers['retry-after-ms']) / 1000
+            if response.headers.get('retry-after'):
+                return float(response.headers['retry-after'])
+        except ValueError:
+            pass
+        return min(DEFAULT_HTTP_BACKOFF * (2 ** attempt), 60)
 
-    def extract_additional_details_from_job_text(self, jd_text, open_ai_key, model_engine='gpt-3.5-turbo'):
+    @staticmethod
+    def parse_json_reply(text_response):
+        """
+        Reads the JSON object or array out of a model reply, tolerating code fences, surrounding prose, empty values,
+        trailing commas and Python-style literals. Raises ValueError when nothing usable is found.
+        """
+        text = JSON_FENCE_PATTERN.sub('', str(text_response).strip())
+        starts = [index for index in (text.find('{'), text.find('[')) if index >= 0]
+        end = max(text.rfind('}'), text.rfind(']'))
+        if not starts or end < min(starts):
+            raise ValueError("no JSON in the reply")
+        candidate = text[min(starts):end + 1]
+        # the repairs are regex rewrites that can also hit string values, so they only apply to replies that need them
+        repaired = TRAILING_COMMA_PATTERN.sub(r'\1', EMPTY_JSON_VALUE_PATTERN.sub(r'\1null', candidate))
+        for text in dict.fromkeys((candidate, repaired)):
+            try:
+                return json.loads(text)
+            except ValueError:
+                pass
+        error = None
+        for text in dict.fromkeys((candidate, repaired)):
+            try:
+                python_literal = re.sub(r'\bnull\b', 'None', re.sub(r'\btrue\b', 'True', re.sub(r'\bfalse\b', 'False', text)))
+                return ast.literal_eval(python_literal)
+            except (ValueError, SyntaxError) as e:
+                error = e
+        raise ValueError(f"reply is not valid JSON: {error}")
+
+    @staticmethod
+    def coerce_number(value):
+        if value is None or isinstance(value, bool):
+            return 0
+        if isinstance(value, (int, float)):
+            return value
+        match = NUMBER_PATTERN.search(str(value).replace(',', ''))
+        if match is None:
+            return 0
+        number = float(match.group())
+        return int(number) if number.is_integer() else number
+
+    @classmethod
+    def validate_job_details(cls, details, require_skills=True):
+        """
+        Checks an extraction against the fields prompt schema and coerces it: numbers default to 0, texts to '' and at
+        most MAX_PREFERRED_SKILLS skills are kept. Raises ValueError when the reply is unusable.
+        """
+        if not isinstance(details, dict):
+            raise ValueError(f"expected a JSON object, got {type(details).__name__}")
+        final_resp = {}
+        if require_skills:
+            skills = details.get('skills')
+            preferred_skills = skills.get('preferredSkills') if isinstance(skills, dict) else skills
+            if not isinstance(preferred_skills, list):
+                raise ValueError("skills.preferredSkills is missing or not a list")
+            # nulls and objects in the list are not skills, only their str() would be
+            skills = [str(skill).strip() for skill in preferred_skills
+                      if isinstance(skill, str) or isinstance(skill, (int, float)) and not isinstance(skill, bool)]
+            final_resp['skills'] = {'preferredSkills': [skill for skill in skills if skill][:MAX_PREFERRED_SKILLS]}
+        for field in JOB_DETAILS_NUMBER_FIELDS:
+            final_resp[field] = cls.coerce_number(details.get(field))
+        for field in JOB_DETAILS_TEXT_FIELDS:
+            final_resp[field] = '' if details.get(field) is None else str(details[field]).strip()
+        return cls.normalize_job_details(final_resp)
+
+    @staticmethod
+    def normalize_job_details(final_resp):
+        if final_resp['max_experience'] < final_resp['min_experience']:
+            final_resp['max_experience'] = final_resp['min_experience']
+        return final_resp
+
+    def query_job_details(self, jd_text, open_ai_key, model_engine='gpt-3.5-turbo', fields_prompt=EXTRACTION_FIELDS_PROMPT):
+        """
+        Asks for the extraction as a JSON object and validates it. A reply that cannot be parsed or misses required
+        fields gets EXTRACTION_REPAIR_ATTEMPTS follow-ups on the same model quoting the error, instead of re-running
+        the job on a larger model.
+        """
         prompt = "extract these details from the following text and just provide a JSON in this format" \
-                 "{'skills': {'preferredSkills': []}, 'min_ctc': , 'max_ctc': , 'min_experience': , 'max_experience': , 'hr_name': '', 'department': }" \
-                 "put maximum 5 items inside preferredSkills and those skills should be keywords only." \
-                 "if min_ctc, max_ctc, min_experience, max_experience, not available then put it zero" \
-                 "hr_name is about any name email or contact number available in the text, put empty string if not there"\
-                 "treat this text as job description and extract what portion or department of the company this job description would be for, put that inside department"\
+                 f"{fields_prompt}" \
                  f"text: {jd_text}"
-        resp = self.create_open_ai_query(prompt, open_ai_key, model_engine=model_engine)
-        if resp['success']:
-            final_resp = self.validate_and_send_correct_evaluation_response(resp['data'])
-            if final_resp['max_experience'] < final_resp['min_experience']:
-                final_resp['max_experience'] = final_resp['min_experience']
-            return final_resp
-        return {}
+        messages = [{"role": "user", "content": prompt}]
+        for attempt in range(EXTRACTION_REPAIR_ATTEMPTS + 1):
+            resp = self.create_open_ai_query(prompt, open_ai_key, model_engine=model_engine, messages=messages,
+                                             json_mode=self.structured_output)
+            if not resp['success']:
+                return {}
+            try:
+                return self.validate_job_details(self.parse_json_reply(resp['data']), require_skills='preferredSkills' in fields_prompt)
+            except ValueError as e:
+                if attempt == EXTRACTION_REPAIR_ATTEMPTS:
+                    logger.info(f"extraction reply still unusable after repair: {str(e)}")
+                    self.metrics.increment('llm_extraction_failures')
+                    return {}
+                self.metrics.increment('llm_repairs')
+                messages = messages + [{"role": "assistant", "content": resp['data']},
+                                       {"role": "user", "content": EXTRACTION_REPAIR_PROMPT.format(error=str(e))}]
 
-    @staticmethod
-    def get_hiring_team(jd_soup):
-        h3 = jd_soup.find('h3', {'class': 'base-main-card__title font-sans text-[18px] font-bold text-color-text overflow-hidden'})
-        if h3:
-            return h3.text.strip()
-        return ''
+    def query_job_details_batch(self, jd_texts, open_ai_key, model_engine='gpt-3.5-turbo', fields_prompt=EXTRACTION_FIELDS_PROMPT):
+        """
+        Packs several job descriptions into one prompt and maps the returned JSON array back by id. Items missing from
+        the answer or failing validation are extracted again one by one.
+        """
+        prompt = "extract these details from each of the following texts and just provide a JSON object with a 'jobs' array " \
+                 "holding one object per text, each object carrying the 'id' of its text and the details in this format" \
+                 f"{fields_prompt}"
+        for id, jd_text in enumerate(jd_texts):
+            prompt += f"\nid: {id}\ntext: {jd_text}"
+        resp = self.create_open_ai_query(prompt, open_ai_key, model_engine=model_engine, max_tokens=150 * len(jd_texts),
+                                         json_mode=self.structured_output)
+        if not resp['success']:
+            return [{} for _ in jd_texts]
+        reply = self.parse_json_reply(resp['data'])
+        details_by_id = {}
+        for details in reply.get('jobs', []) if isinstance(reply, dict) else reply:
+            try:
+                details_by_id[int(details['id'])] = self.validate_job_details(details, require_skills='preferredSkills' in fields_prompt)
+            except (KeyError, TypeError, ValueError):
+                continue
+        return [details_by_id[id] if id in details_by_id else
+                self.query_job_details(jd_text, open_ai_key, model_engine=model_engine, fields_prompt=fields_prompt)
+                for id, jd_text in enumerate(jd_texts)]
+
+    def extract_additional_details_from_job_text(self, jd_text, open_ai_key, model_engine='gpt-3.5-turbo'):
+        local_skills = self.skill_matcher.find(jd_text) if self.skill_matcher is not None else []
+        if len(local_skills) < self.local_skills_min_terms:
+            # too few vocabulary terms to stand in for the LLM's skills, it is asked for them as well
+            local_skills = []
+        fields_prompt = EXTRACTION_FIELDS_PROMPT_WITHOUT_SKILLS if local_skills else EXTRACTION_FIELDS_PROMPT
+        if self.jd_compactor is not None:
+            jd_text, tokens_saved = self.jd_compactor.compact(jd_text)
+            logger.debug(f"job description compacted to {self.jd_compactor.estimate_tokens(jd_text)} tokens, {tokens_saved} saved")
+            self.metrics.increment('jd_compactions')
+            self.metrics.increment('jd_tokens_saved', tokens_saved)
+        cache_key = self.llm_cache.key(jd_text, model_engine, fields_prompt)
+        final_resp = self.llm_cache.get(cache_key)
+        if final_resp is None:
+            if self.llm_batcher is not None and len(jd_text) <= self.llm_batcher.max_chars:
+                final_resp = self.llm_batcher.submit(jd_text, open_ai_key, model_engine, fields_prompt).result()
+            else:
+                final_resp = self.query_job_details(jd_text, open_ai_key, model_engine=model_engine, fields_prompt=fields_prompt)
+            if final_resp:
+                self.llm_cache.put(cache_key, final_resp)
+        if final_resp and local_skills:
+            final_resp = final_resp | {'skills': {'preferredSkills': local_skills}}
+        return final_resp
 
     @staticmethod
     def remove_html_tags(text):
-        clean = re.compile('<.*?>')
-        return re.sub(clean, ' ', text)
+        return HTML_TAG_PATTERN.sub(' ', text)
 
-    def read(
-            self, logger: AirbyteLogger, config: json, catalog: ConfiguredAirbyteCatalog, state: Dict[str, any]
-    ) -> Generator[AirbyteMessage, None, None]:
+    @staticmethod
+    def load_sync_state(state):
+        """
+        Returns the job_roles stream state ({'roles': {role: cursor}, 'sync': in-progress marker}) from either the
+        per-stream state messages or a legacy state dict.
+        """
+        if not state:
+            return {}
+        if isinstance(state, dict):
+            return dict(state.get('job_roles', {}))
+        for message in state:
+            if isinstance(message, dict):
+                message = AirbyteStateMessage.parse_obj(message)
+            stream = message.stream
+            if stream and stream.stream_descriptor.name == 'job_roles' and stream.stream_state:
+                return stream.stream_state.dict()
+        return {}
 
+    @staticmethod
+    def get_job_roles(config):
         config_role = config['job_role']
         if config_role == 'dummy':
-            job_roles = ["Angular Developer", "Angular JS Developer", "Associate Software Engineer", "Backend Developer", "C# Developer",
-                         "C++ Developer", "Developer", "Client-Side Developer", "Embedded Software Developer", "Embedded Software Engineer",
-                         "Front End Web Developer", "Front-End Developer", "Frontend Angular Developer", "Frontend Architect",
-                         "Frontend Developer", "Frontend Engineer", "Frontend Web Developer", "Full Stack Developer",
-                         "Full Stack Java Developer", "Full Stack Software Engineer", "HTML Developer", "Java Backend Developer",
-                         "Java Developer", "Java Fullstack Developer", "Java Microservices Developer", "Java React Developer",
-                         "Java SpringBoot Developer", "Javascript Developer", "Junior Software Developer", "Junior Software Engineer",
-                         "Mean Stack Developer", "MERN Stack Developer", "MIS", "MIS Analyst", "MIS Executive and Analyst",
-                         "Node JS Developer", "Node.js Developer", "Python Developer", "Python/Django Developer", "React Developer",
-                         "React Js Developer", "React.js Developer", "React/Frontend Developer", "React+Node Js Developer",
-                         "RIM Support Engineer", "Ruby on Rails Developer", "SAP HANA DB Administration Software Development Engineer",
-                         "Software Developer", "Software Development Engineer", "Software Engineer", "Software Engineer Trainee",
-                         "Software Programmer", "Solution Developer", "SYBASE Database Administration Software Development Engineer",
-                         "Trainee Associate Engineer", "Trainee Software Developer", "Trainee Software Engineer", "UI Angular Developer",
-                         "UI Developer", "UI Frontend Developer", "UI/Frontend Developer", "UI/UX Developer", "Web and Software Developer",
-                         "Web Designer & Developer", "Web Designer and Developer", "Web Designer/Developer", "Web Developer",
-                         "Web Developer and Designer", "Website Designer", "website developer", "XML and C# Developer", "PHP Developer",
-                         "Laravel Developer", "Magento Developer", "Drupal Developer", "Dotnet developer", ".net ", "Vue.JS Developer",
-                         "Python/Django Developer", "GoLang developer", "jQuery", "Springboot Developer", "Actuarial Analyst", "Analyst",
-                         "AR Analyst", "Associate Business Analyst", "Automation Test Analyst", "Azure Data Engineer", "Big Data Engineer",
-                         "Business Analyst", "Business Data Analyst", "Data Analyst", "Data Analytics Trainer", "Data Research Analyst",
-                         "Data Researcher", "Data Science Engineer", "Data Scientist", "Database Administrator", "Functional Analyst",
-                         "Junior Analyst", "Junior Research Analyst", "KYC Analyst", "Market Research Analyst", "Power BI Developer",
-                         "Product Analyst", "Programmer Analyst", "QA Analyst", "Quality Analyst", "Real Time Analyst",
-                         "Reconciliation Analyst", "Research Analyst", "Risk Analyst", "Sales Analyst", "Salesforce Business Analyst",
-                         "Service Desk Analyst", "SOC Analyst", "SQL Developer", "Android Application Developer", "Android Developer",
-                         "Android Mobile Application Developer", "Application Developer", "Application Support Engineer",
-                         "Flutter Developer", "iOS Application Developer", "IOS Developer", "Mobile App Developer",
-                         "Mobile Application Developer", "Associate Technical Support Engineer", "Automation Engineer",
-                         "Automation Test Engineer", "Batch Support Engineer", "Desktop Support Engineer", "Genesys Support Engineer",
-                         "IT Support Engineer", "Network Support Engineer", "QA Automation Engineer", "SaaS Support Engineer",
-                         "Security Engineer", "Test Automation Engineer", "Systems Support Engineer",
-                         "Software Development Engineer - Test", "Software Test Engineer", "Software Tester", "Support Engineer",
-                         "Tech Customer Support Engineer", "Technical Support Engineer", "Servicenow Developer", "SharePoint Developer",
-                         "Shopify Developer", "Unity Game Developer", "WordPress & Shopify Developer", "WordPress Developer",
-                         "Wordpress Web Developer", "Unreal Developer"]
-            for id, jr in enumerate(job_roles):
-                job_roles[id] = jr.replace(" ", "%20")
-        elif config_role == 'Analyst':
-            job_roles = [
-                "Analyst",
-                "Analytical",
-                "analytical skill",
-                "Analytical Skills",
-                "Analytics",
-                "BeautifulSoup",
-                "big data",
-                "Bigcommerce",
-                "BIGDATA",
-                "Business analysis",
-                "Business process",
-                "Business Process Management",
-                "Business Requirement Analysis",
-                "Caffe",
-                "cassandra",
-                "Consulting",
-                "CuDNN",
-                "data acquisition",
-                "Data analysis",
-                "Data Architecture",
-                "Data Engineer",
-                "Data Engineering",
-                "Data Factory",
-                "data governance",
-                "Data Loader",
-                "Data Management",
-                "Data Migration",
-                "Data modeling",
-                "Data Models",
-                "data pipeline architecture",
-                "Data processing",
-                "data protection",
-                "Data quality",
-                "data science",
-                "Data validation",
-                "Data verse in PowerAERROR!",
-                "data warehouse",
-                "Data-Binding",
-                "Database Design",
-                "Database management",
-                "Database Schema",
-                "DAX queries",
-                "Db2",
-                "Dynamo Db",
-                "ETL",
-                "ETL design",
-                "Excel",
-                "Hadoop",
-                "IT Security Analyst",
-                "Lambda/function",
-                "mangodb",
-                "microsoft",
-                "Microsoft Azure",
-                "Microsoft azure data factory",
-                "Mongo DB",
-                "MongoDB",
-                "MS Access",
-                "MS Office",
-                "MS SQL",
-                "Ms Sql Database",
-                "Ms Sql Serve",
-                "MSMQ",
-                "MSSQL",
-                "Mysq",
-                "MySQL",
-                "MySQL. HTML",
-                "NLP",
-                "NoSQL",
-                "OpenCV",
-                "Phyton",
-                "Pinecone DB",
-                "PL/SQL",
-                "PLSQL",
-                "Postgres",
-                "Postgresql",
-                "Power BI",
-                "Problem Solving",
-                "Problem Solving & Analytical Skills",
-                "Process Analytics",
-                "PySpark",
-                "Python",
-                "Python Development",
-                "Python Framework",
-                "python progaraming",
-                "RDBMS",
-                "Rdbms Concepts",
-                "RDS",
-                "redshift",
-                "Relational database",
-                "relational databases",
-                "Scala",
-                "scrapy",
-                "scrapy framework",
-                "Spark",
-                "SQL",
-                "SQL Azure",
-                "SQL Database",
-                "sql knowledge",
-                "SQL queries",
-                "SQL Server",
-                "SQL Server ASP.Net",
-                "SQL Server Development",
-                "SQLit",
-                "SQLite",
-                "SQLite Database",
-                "sqs",
-                "SSIS",
-                "SSRS",
-                "Stored procedures",
-                "tableau",
-                "TensorFlow",
-                "Theano",
-                "Torch",
-                "Triggers",
-                "Advanced Excel",
-                "BA",
-                "business Analyst",
-                "Business Analytics",
-                "Business Intelligence (BI)",
-                "data analyst",
-                "data analytics",
-                "data cleansing",
-                "Data Scraping",
-                "Database",
-                "Database Planning",
-                "database structures",
-                "Databases Postgres",
-                "ETL Tool",
-                "Extraction",
-                "Fabrication",
-                "Google Analytics",
-                "H look up",
-                "macros",
-                "Management Information System",
-                "Microsoft applications",
-                "MIS",
-                "MS SQLServer",
-                "MS-Excel",
-                "Nosql Databases",
-                "numpy",
-                "Outlook",
-                "panda",
-                "PowerPoint.",
-                "Qlik",
-                "query",
-                "Regression testing",
-                "Regular Expressions",
-                "spreadsheets",
-                "statistical analyses",
-                "vlook up",
-                "Warehousing",
-                "WCF Data Services",
-                "Word",
-                "AI",
-                "analysis",
-                "Analysts",
-                "Associate Analyst",
-                "bi",
-                "Bi Tools",
-                "BigQuery",
-                "business analyst bpo",
-                "business intelligence",
-                "Business operations",
-                "business process analysis",
-                "business requirements",
-                "Business Research",
-                "Business services",
-                "business system",
-                "Concatenate",
-                "CouchD",
-                "dashboards",
-                "Data collection",
-                "data collection systems",
-                "Data communication",
-                "Data entry operation",
-                "data integrity",
-                "Data Mapping",
-                "data mining",
-                "Data Reporting",
-                "Data Sciences",
-                "data visualization",
-                "Data warehousing",
-                "Database Management System",
-                "Database testing",
-                "DB",
-                "dbms",
-                "deep learning",
-                "excel google analytics",
-                "Google Sheets",
-                "hlookup",
-                "Index Optimization",
-                "IT Business Analyst",
-                "IT Consulting",
-                "IT Management",
-                "IT Operations Management",
-                "looker",
-                "Mango Db",
-                "Marketing analytics",
-                "Marketing operations",
-                "Mathematics",
-                "Memcached",
-                "Microstrategy",
-                "MIS documentation",
-                "Mis Report Preparation",
-                "MIS reporting",
-                "Ms excel",
-                "Natural language processing",
-                "Php And Mysql",
-                "Php Codeigniter",
-                "Pivot",
-                "pivot table",
-                "PL-SQL",
-                "Portfolio management",
-                "postgrest",
-                "Power Query",
-                "Powerpoint",
-                "predictive analytics",
-                "prescriptive analytics",
-                "Python or PHP",
-                "R",
-                "Reporting tools",
-                "Risk analysis",
-                "SAS",
-                "Schema",
-                "Senior Analyst",
-                "Site Analysis",
-                "Snowflake DB",
-                "SPSS",
-                "Statistical process control",
-                "Statistical Tools",
-                "statistics",
-                "System analysis",
-                "Systems Analysis",
-                "T-SQL",
-                "Teradata",
-                "VB SCRIPT",
-                "VBA",
-                "vlookup",
-                "Webmaster",
-                "Website Analysis",
-                "zoho analytics",
-            ]
-        else:
-            job_roles = [config_role]
+            return [jr.replace(" ", "%20") for jr in dummy_job_roles]
+        if config_role == 'Analyst':
+            return list(analyst_job_roles)
+        return [config_role]
 
-        for job_role in job_roles:
-            self.driver = webdriver.Chrome(executable_path=os.getenv("CHROME_DRIVER_PATH"), options=chrome_options)
+    @staticmethod
+    def shard_roles(job_roles, shard_index=0, shard_count=1):
+        """
+        Keeps the roles belonging to shard_index. Roles are assigned by a stable hash of their normalized name, so every
+        process or node given the same shard_count agrees on the partition regardless of list order, and variants the
+        query planner would search together ("React Developer", "React.js Developer") land on the same shard.
+        """
+        if shard_count <= 1:
+            return job_roles
+        if not 0 <= shard_index < shard_count:
+            raise ValueError(f"shard_index must be in [0, {shard_count}), got {shard_index}")
+        return [job_role for job_role in job_roles
+                if zlib.crc32(QueryPlanner.normalize(job_role).encode('utf-8')) % shard_count == shard_index]
+
+    @staticmethod
+    def shard_config(config, shard_index, shard_count):
+        # records travel to the parent as messages, shards must not write to the shared stdout themselves
+        shard_config = dict(config, shard_index=shard_index, shard_count=shard_count, emit_mode='messages')
+        for key in SHARD_LOCAL_PATHS:
+            if shard_config.get(key):
+                shard_config[key] = f"{shard_config[key]}.shard{shard_index}"
+        return shard_config
 
-            job_role_data = {'title': job_role}
-            yield AirbyteMessage(
-                type=Type.RECORD,
-                record=AirbyteRecordMessage(stream='job_roles', data=job_role_data, emitted_at=int(datetime.now().timestamp()) * 1000),
+    @staticmethod
+    def start_sync_progress(sync_state, config_role):
+        """
+        Returns the in-progress marker of the sync, resuming the previous one if it was interrupted for the same job_role.
+        """
+        progress = sync_state.get('sync')
+        if progress and progress.get('job_role') == config_role:
+            logger.info(f"resuming interrupted sync, {len(progress['completed_roles'])} roles already done")
+            return progress
+        sync_state['sync'] = {'job_role': config_role, 'started_at': int(time.time()), 'completed_roles': []}
+        return sync_state['sync']
+
+    @staticmethod
+    def merge_sync_state(role_cursors, progress, shard_state):
+        for job_role, cursor in shard_state.get('roles', {}).items():
+            if cursor.get('last_synced_at', 0) > role_cursors.get(job_role, {}).get('last_synced_at', 0):
+                role_cursors[job_role] = cursor
+        for job_role in shard_state.get('sync', {}).get('completed_roles', []):
+            if job_role not in progress['completed_roles']:
+                progress['completed_roles'].append(job_role)
+
+    @staticmethod
+    def get_past_time_window(cursor, now, default_past_time=DEFAULT_PAST_TIME):
+        """
+        Narrows the f_TPR filter to the time since the role was last synced, never wider than default_past_time.
+        """
+        default_past_time = past_time_keys.get(default_past_time, default_past_time)
+        if not cursor.get('last_synced_at'):
+            return default_past_time
+        seconds = now - int(cursor['last_synced_at']) + CURSOR_LOOKBACK_SECONDS
+        if seconds >= int(default_past_time.lstrip('r')):
+            return default_past_time
+        return f"r{max(seconds, 60)}"
+
+    @staticmethod
+    def advance_role_cursor(cursor, jd_links, discovered_at, window_seconds, seen_job_ids_ttl=DEFAULT_SEEN_JOB_IDS_TTL):
+        """
+        The next search only looks back to about discovered_at, so seen job IDs older than the window this search used
+        cannot come back and are dropped; the state is checkpointed after every search and stays small.
+        """
+        seen_job_ids = {job_id: seen_at for job_id, seen_at in cursor.get('seen_job_ids', {}).items()
+                        if seen_at >= discovered_at - min(window_seconds, seen_job_ids_ttl)}
+        for jd_link in jd_links:
+            seen_job_ids.setdefault(JobIndex.job_id(jd_link), discovered_at)
+        if len(seen_job_ids) > MAX_SEEN_JOB_IDS_PER_ROLE:
+            seen_job_ids = dict(sorted(seen_job_ids.items(), key=lambda item: item[1])[-MAX_SEEN_JOB_IDS_PER_ROLE:])
+        return {'last_synced_at': discovered_at, 'seen_job_ids': seen_job_ids}
+
+    @staticmethod
+    def state_message(stream_name, stream_state=None):
+        return AirbyteMessage(
+            type=Type.STATE,
+            state=AirbyteStateMessage(
+                type=AirbyteStateType.STREAM,
+                stream=AirbyteStreamState(
+                    stream_descriptor=StreamDescriptor(
+                        name=stream_name
+                    ),
+                    stream_state=AirbyteStateBlob.parse_obj(stream_state) if stream_state is not None else None,
+                ),
             )
-            try:
-                jd_links = self.get_all_jobs_jd_links(job_role=job_role)
-            except Exception as e:
-                logger.info("failed jd link", job_role, str(e))
-                jd_links = []
-            for jd_link in jd_links:
-                job_details = {
-                    'job_description_url': jd_link,
-                    'job_description_url_without_job_id': jd_link,
-                    'job_role': job_role,
-                    'job_source': 'linkedin',
-                    'job_type': 'full-time'
-                }
-                try:
-                    jd_link = jd_link.replace("https://in.", "https://www.")
-                    soup = self.create_soup(jd_link)
-                    company_details = {}
-
-                    hr_name = self.get_hiring_team(soup)
-
-                    h1_tag = soup.find("h1", class_="top-card-layout__title")
-                    if h1_tag:
-                        job_details['job_title'] = h1_tag.text
-
-                    company_span_tags = soup.find_all("span", class_=lambda x: x and "topcard__flavor" in x.split())
-                    for span in company_span_tags:
-                        a_tag = span.find("a")
-                        if a_tag:
-                            text = a_tag.text.strip()
-                            href = a_tag.get("href")
-                            company_details['name'] = text
-                            company_details['linkedin_url'] = str(href).split("?")[0]
-
-                    details_span_tags = soup.find_all("span", class_=lambda x: x and "topcard__flavor--bullet" in x.split())
-                    span_texts = []
-                    for span in details_span_tags:
-                        span_texts.append(span.text.strip())
-                    if len(span_texts) == 1:
-                        job_details['job_location'] = span_texts[0]
-                    if len(span_texts) == 2:
-                        job_details['job_location'] = span_texts[0]
-                        job_details['raw_response'] = {'applicants': span_texts[1]}
-
-                    div_tags = soup.find_all("div", class_=lambda x: x and "show-more-less-html__markup" in x.split())
-                    for div in div_tags:
-                        html_content = div.decode_contents()
-                        job_details['job_description_raw_text'] = self.remove_html_tags(html_content.strip())
-
-                    # ul_tag = soup.find("ul", class_=lambda x: x and "description__job-criteria-list" in x.split())
-                    # li_tags = ul_tag.find_all("li")
-                    # for li in li_tags:
-                    #     h3_tag = li.find("h3")
-                    #     h3_text = h3_tag.get_text(strip=True) if h3_tag else ""
-                    #     span_tag = li.find("span")
-                    #     span_text = span_tag.get_text(strip=True) if span_tag else ""
-                    #     job_details[h3_text] = span_text
-
-                    yield AirbyteMessage(
-                        type=Type.RECORD,
-                        record=AirbyteRecordMessage(stream='companies', data=company_details, emitted_at=int(datetime.now().timestamp()) * 1000),
-                    )
-
-                    job_details['company'] = company_details['name']
+        )
+
+    def final_state_messages(self, sync_state):
+        sync_state.pop('sync', None)
+        for stream_name in ["companies", "job_openings", "recruiter_details"]:
+            yield self.state_message(stream_name)
+        yield self.state_message('job_roles', sync_state)
 
+    def update_metrics_gauges(self):
+        counters = self.metrics.counters
+        self.metrics.set_gauge('llm_cache_hits', self.llm_cache.hits)
+        self.metrics.set_gauge('llm_cache_misses', self.llm_cache.misses)
+        self.metrics.set_gauge('llm_cache_hit_ratio', round(self.llm_cache.hit_ratio(), 4))
+        extractions = counters.get('llm_extractions', 0)
+        self.metrics.set_gauge('llm_repair_ratio', round(counters.get('llm_repairs', 0) / extractions, 4) if extractions else 0.0)
+        self.metrics.set_gauge('job_index_size', len(self.job_index))
+
+    def metrics_message(self):
+        self.update_metrics_gauges()
+        self.metrics.write_prometheus()
+        return AirbyteMessage(
+            type=Type.LOG,
+            log=AirbyteLogMessage(level=Level.INFO, message=f"sync metrics: {json.dumps(self.metrics.snapshot())}"),
+        )
+
+    @staticmethod
+    def get_base_job_details(jd_link, job_role, cell=None):
+        """
+        The job_openings fields known before the page is read. The search cell the posting was found in gives its job
+        type and level and a location the page's own replaces.
+        """
+        cell = cell or {}
+        return {
+            'job_description_url': jd_link,
+            'job_description_url_without_job_id': jd_link,
+            'job_role': job_role,
+            'job_source': 'linkedin',
+            'job_type': cell.get('job_type', DEFAULT_SEARCH_JOB_TYPE).replace('_', '-'),
+            'job_level': cell.get('job_level', DEFAULT_SEARCH_JOB_LEVEL).replace('_', '-'),
+            'job_location': cell.get('location', DEFAULT_SEARCH_LOCATION),
+        }
+
+    def fetch_job_page(self, jd_link):
+        """
+        Fetch stage: downloads and parses the job page. Returns None when the page could not be fetched or parsed.
+        """
+        try:
+            html = self.fetch_page(jd_link.replace("https://in.", "https://www."))
+            with self.metrics.timer('parse'):
+                return self.html_parser.parse_job_page(html)
+        except Exception as e:
+            logger.info(f"failed {jd_link}: {str(e)}")
+            return None
+
+    def get_job_records(self, jd_link, job_role, config, page, cell=None):
+        """
+        Enrich stage: turns a parsed job page into its companies, job_openings and recruiter_details records. Returns
+        (records, enriched), enriched being False when only a bare job_openings record could be built.
+        """
+        records = []
+        job_details = self.get_base_job_details(jd_link, job_role, cell)
+        if page is None:
+            return [('job_openings', job_details)], False
+        try:
+            jd_link = jd_link.replace("https://in.", "https://www.")
+            company_details = page['company']
+
+            hr_name = page['hr_name']
+
+            if page['job_title'] is not None:
+                job_details['job_title'] = page['job_title']
+
+            span_texts = page['flavor_bullets']
+            if len(span_texts) == 1:
+                job_details['job_location'] = span_texts[0]
+            if len(span_texts) == 2:
+                job_details['job_location'] = span_texts[0]
+                job_details['raw_response'] = {'applicants': span_texts[1]}
+
+            if page['description_html'] is not None:
+                job_details['job_description_raw_text'] = self.remove_html_tags(page['description_html'].strip())
+
+            # ul_tag = soup.find("ul", class_=lambda x: x and "description__job-criteria-list" in x.split())
+            # li_tags = ul_tag.find_all("li")
+            # for li in li_tags:
+            #     h3_tag = li.find("h3")
+            #     h3_text = h3_tag.get_text(strip=True) if h3_tag else ""
+            #     span_tag = li.find("span")
+            #     span_text = span_tag.get_text(strip=True) if span_tag else ""
+            #     job_details[h3_text] = span_text
+
+            records.append(('companies', company_details))
+
+            job_details['company'] = company_details['name']
+
+            sketch = duplicate = None
+            if self.near_duplicates is not None:
+                sketch = self.near_duplicates.sketch(job_details['job_description_raw_text'])
+                duplicate = self.near_duplicates.find(sketch)
+            if duplicate is not None:
+                ai_response = duplicate['extraction']
+                job_details['raw_response'] = job_details.get('raw_response', {}) | {'near_duplicate_of': {
+                    'job_id': duplicate['job_id'],
+                    'job_description_url': duplicate['jd_link'],
+                    'similarity': round(duplicate['similarity'], 3),
+                }}
+                self.metrics.increment('near_duplicate_reuses')
+            else:
+                with self.metrics.timer('enrich'):
                     ai_response = self.extract_additional_details_from_job_text(job_details['job_description_raw_text'],
                                                                                 config['open_ai_api_key'])
-                    if 'skills' not in ai_response:
-                        logger.info('skills not found')
-                        ai_response = self.extract_additional_details_from_job_text(job_details['job_description_raw_text'],
-                                                                                    config['open_ai_api_key'], model_engine='gpt-4')
-                    job_details = job_details | ai_response
-                    yield AirbyteMessage(
-                        type=Type.RECORD,
-                        record=AirbyteRecordMessage(stream='job_openings', data=job_details, emitted_at=int(datetime.now().timestamp()) * 1000),
-                    )
-                    recruiter_details = {
-                        'short_intro': ai_response['hr_name']
-                    }
-
-                    if hr_name:
-                        recruiter_details = recruiter_details | {
-                            'name': hr_name,
-                            'hiring_manager_for_job_link': jd_link,
-                            'company': company_details['name'],
-                            'linkedin_profile_url': f"dummy_{hr_name}_{company_details['name']}"
-                        }
-
-                        yield AirbyteMessage(
-                            type=Type.RECORD,
-                            record=AirbyteRecordMessage(stream='recruiter_details', data=recruiter_details, emitted_at=int(datetime.now().timestamp()) * 1000),
-                        )
+                    self.metrics.increment('llm_extractions')
+                if 'skills' not in ai_response:
+                    logger.info('skills not found')
+                if sketch is not None and 'skills' in ai_response:
+                    self.near_duplicates.add(sketch, JobIndex.job_id(jd_link), jd_link, ai_response)
+            if not ai_response:
+                records.append(('job_openings', job_details))
+                return records, False
+            job_details = job_details | ai_response
+            records.append(('job_openings', job_details))
+            recruiter_details = {
+                'short_intro': ai_response.get('hr_name', '')
+            }
+
+            if hr_name:
+                recruiter_details = recruiter_details | {
+                    'name': hr_name,
+                    'hiring_manager_for_job_link': jd_link,
+                    'company': company_details['name'],
+                    'linkedin_profile_url': f"dummy_{hr_name}_{company_details['name']}"
+                }
+
+                records.append(('recruiter_details', recruiter_details))
+        except Exception as e:
+            logger.info(f"failed {jd_link}: {str(e)}")
+            records.append(('job_openings', job_details))
+            return records, False
+        return records, True
+
+    def read(
+            self, logger: AirbyteLogger, config: json, catalog: ConfiguredAirbyteCatalog, state: Dict[str, any]
+    ) -> Generator[AirbyteMessage, None, None]:
+
+        shard_processes = int(config.get('shard_processes', 1))
+        if shard_processes > 1 and 'shard_index' not in config:
+            yield from self.read_shards(logger, config, state, shard_processes)
+            return
+
+        self.metrics = Metrics.from_config(config)
+        if self._http_client is None:
+            self._http_client = HttpClient.from_config(config)
+        if self._driver_pool is None:
+            self._driver_pool = DriverPool.from_config(config, metrics=self.metrics)
+        self.job_index = JobIndex.from_config(config)
+        self.llm_cache = LlmCache.from_config(config)
+        self.page_cache = PageCache.from_config(config)
+        self.near_duplicates = NearDuplicateIndex.from_config(config)
+        self.linkedin_throttle = HostThrottle.from_config(config, metrics=self.metrics)
+        self.openai_limiter = RateLimiter.from_config(config)
+        self.llm_batcher = LlmBatcher.from_config(self, config)
+        self.skill_matcher = skill_matcher if config.get('local_skill_extraction', True) else None
+        self.local_skills_min_terms = 1 if config['job_role'] == 'Analyst' else \
+            max(int(config.get('local_skills_min_terms', DEFAULT_LOCAL_SKILLS_MIN_TERMS)), 1)
+        self.jd_compactor = JobDescriptionCompactor.from_config(config)
+        self.structured_output = bool(config.get('structured_output', True))
+        self.query_planner = QueryPlanner.from_config(config)
+        self.role_scheduler = RoleScheduler.from_config(config)
+        self.html_parser = JobPageParser.from_config(config)
+        self.linkedin_base_url = config.get('linkedin_base_url', LINKEDIN_BASE_URL).rstrip('/')
+        self.openai_base_url = config.get('openai_base_url', OPENAI_BASE_URL).rstrip('/')
+
+        job_roles = self.shard_roles(self.get_job_roles(config), int(config.get('shard_index', 0)),
+                                     int(config.get('shard_count', 1)))
+        sync_state = self.load_sync_state(state)
+        role_cursors = sync_state.setdefault('roles', {})
+        progress = self.start_sync_progress(sync_state, config['job_role'])
+        completed_roles = set(progress['completed_roles'])
+        seen_job_ids_ttl = float(config.get('seen_job_ids_ttl_seconds', DEFAULT_SEEN_JOB_IDS_TTL))
+
+        discovery_options = self.get_discovery_options(config)
+        search_matrix = SearchMatrix.from_config(config)
+        if len(search_matrix.cells) > 1 and search_matrix.cell_parallelism:
+            discovery_options['discovery_parallelism'] = min(discovery_options['discovery_parallelism'], search_matrix.cell_parallelism)
+
+        def discover(search):
+            search_roles = self.query_planner.search_roles(search)
+            context = {'jd_links': None, 'discovered_at': int(time.time()), 'new_jobs': dict.fromkeys(search_roles, 0),
+                       'discovery_seconds': 0.0}
+            # one search serves all of its roles, so each cell looks as far back as the least recently synced of them needs
+            cells = [cell | {'past_time': max((self.get_past_time_window(role_cursors.get(job_role, {}), context['discovered_at'], cell['past_time'])
+                                               for job_role in search_roles), key=lambda window: int(window.lstrip('r')))}
+                     for cell in search_matrix.cells]
+            context['window_seconds'] = max(int(cell['past_time'].lstrip('r')) for cell in cells)
+            seen_job_ids = {job_role: role_cursors.get(job_role, {}).get('seen_job_ids', {}) for job_role in search_roles}
+
+            def jobs():
+                jd_links = {job_role: [] for job_role in search_roles}
+                # discovery time leaves out the time spent waiting for the pipeline to take the yielded jobs
+                resumed_at = time.monotonic()
+                try:
+                    with self.metrics.timer('discovery'):
+                        for jd_link, cell in self.get_search_matrix_jd_links(search['keywords'], cells, search_matrix.parallelism,
+                                                                             **discovery_options):
+                            context['discovery_seconds'] += time.monotonic() - resumed_at
+                            for job_role in self.query_planner.attribute(search, jd_link):
+                                jd_links[job_role].append(jd_link)
+                                if JobIndex.job_id(jd_link) in seen_job_ids[job_role]:
+                                    continue
+                                context['new_jobs'][job_role] += 1
+                                # postings already claimed by an earlier role are not fetched again, they only get a bare job_openings record
+                                yield jd_link, job_role, self.job_index.claim(jd_link, job_role), cell
+                            resumed_at = time.monotonic()
                 except Exception as e:
-                    logger.info("failed", jd_link, str(e))
-                    yield AirbyteMessage(
-                        type=Type.RECORD,
-                        record=AirbyteRecordMessage(stream='job_openings', data=job_details, emitted_at=int(datetime.now().timestamp()) * 1000),
-                    )
-
-        for stream_name in ["companies", "job_openings", "recruiter_details", "job_roles"]:
-            yield AirbyteMessage(
-                type=Type.STATE,
-                state=AirbyteStateMessage(
-                    type=AirbyteStateType.STREAM,
-                    stream=AirbyteStreamState(
-                        stream_descriptor=StreamDescriptor(
-                            name=stream_name
-                        )
-                    ),
-                )
-            )
+                    logger.info(f"failed jd link {search['keywords']}: {str(e)}")
+                    return
+                finally:
+                    context['discovery_seconds'] += time.monotonic() - resumed_at
+                # the cursors only advance once discovery for the search has completed
+                context['jd_links'] = jd_links
+
+            return context, jobs()
+
+        def fetch(job):
+            jd_link, job_role, is_new, cell = job
+            return self.fetch_job_page(jd_link) if is_new else None
+
+        def enrich(job, page):
+            jd_link, job_role, is_new, cell = job
+            if not is_new:
+                return None, [('job_openings', self.get_base_job_details(jd_link, job_role, cell))]
+            records, enriched = self.get_job_records(jd_link, job_role, config, page, cell)
+            return jd_link if enriched else None, records
+
+        pipeline = JobPipeline.from_config(config, metrics=self.metrics)
+        emitter = RecordEmitter.from_config(config, metrics=self.metrics)
+        roles_to_sync = [job_role for job_role in job_roles if job_role not in completed_roles]
+        role_stats = {job_role: role_cursors.get(job_role, {}).get('stats') for job_role in roles_to_sync}
+        now = int(time.time())
+        due_roles = [job_role for job_role in roles_to_sync if self.role_scheduler.is_due(role_stats[job_role], now)]
+        if len(due_roles) < len(roles_to_sync):
+            logger.info(f"backing off {len(roles_to_sync) - len(due_roles)} roles that found nothing new in their last syncs")
+        self.metrics.set_gauge('roles_backed_off', len(roles_to_sync) - len(due_roles))
+        searches = self.role_scheduler.order(self.query_planner.plan(due_roles), role_stats)
+        logger.info(f"planned {len(searches)} searches for {len(due_roles)} roles")
+        self.metrics.set_gauge('planned_searches', len(searches))
+        try:
+            for event in pipeline.run(self.role_scheduler.within_budget(searches), discover, fetch, enrich):
+                if event[0] == 'role_started':
+                    for job_role in self.query_planner.search_roles(event[1]):
+                        message = emitter.emit('job_roles', {'title': job_role})
+                        if message is not None:
+                            yield message
+                elif event[0] == 'records':
+                    enriched_link, records = event[1]
+                    for stream_name, data in records:
+                        message = emitter.emit(stream_name, data)
+                        if message is not None:
+                            yield message
+                    # saved in the job index only now, a posting claimed but not emitted is fetched again by the next run
+                    if enriched_link is not None:
+                        self.job_index.complete(enriched_link)
+                    if self.metrics.due():
+                        emitter.flush()
+                        yield self.metrics_message()
+                else:
+                    _, search, context = event
+                    search_roles = self.query_planner.search_roles(search)
+                    failed = context['jd_links'] is None
+                    for job_role in search_roles:
+                        cursor = role_cursors.get(job_role, {})
+                        if not failed:
+                            # only postings whose enriched records went out, here or for an earlier role, count as seen;
+                            # a blocked fetch or failed extraction is found and fetched again by the next sync
+                            jd_links = [jd_link for jd_link in context['jd_links'][job_role] if self.job_index.is_complete(jd_link)]
+                            cursor = self.advance_role_cursor(cursor, jd_links, context['discovered_at'], context['window_seconds'],
+                                                              seen_job_ids_ttl)
+                        # the roles of a combined search share its discovery time
+                        cursor['stats'] = self.role_scheduler.record(role_stats[job_role], context['new_jobs'][job_role],
+                                                                     context['discovery_seconds'] / len(search_roles), failed, int(time.time()))
+                        role_cursors[job_role] = cursor
+                        progress['completed_roles'].append(job_role)
+                    emitter.flush()
+                    yield self.state_message('job_roles', sync_state)
+        finally:
+            emitter.flush()
+            self.driver_pool.close()
+            self.job_index.save()
+            logger.info(f"llm cache hits: {self.llm_cache.hits}, misses: {self.llm_cache.misses}")
+            if self.metrics.enabled:
+                self.update_metrics_gauges()
+                self.metrics.write_prometheus()
+            self.llm_cache.close()
+            if self.page_cache is not None:
+                self.page_cache.close()
+            if self.near_duplicates is not None:
+                self.near_duplicates.close()
+
+        if self.metrics.enabled:
+            yield self.metrics_message()
+
+        yield from self.final_state_messages(sync_state)
+
+    def read_shards(self, logger, config, state, shard_count):
+        """
+        Runs shard_count local processes, each reading its own shard of the roles with its own drivers and HTTP pool.
+        Their records and logs are passed through; their job_roles states are merged into one state for the sync.
+        """
+        context = multiprocessing.get_context(config.get('shard_start_method'))
+        messages = context.Queue(maxsize=SHARD_QUEUE_SIZE)
+        sync_state = self.load_sync_state(state)
+        role_cursors = sync_state.setdefault('roles', {})
+        progress = self.start_sync_progress(sync_state, config['job_role'])
+        workers = [
+            context.Process(target=run_shard, args=(self.shard_config(config, shard_index, shard_count), state, messages),
+                            name=f"shard-{shard_index}", daemon=True)
+            for shard_index in range(shard_count)
+        ]
+        for worker in workers:
+            worker.start()
+        # shard records are emitted again here, which also drops companies and recruiters repeated across shards
+        emitter = RecordEmitter.from_config(config)
+        finished = set()
+        failures = []
+        try:
+            while len(finished) < shard_count:
+                try:
+                    shard_index, message = messages.get(timeout=SHARD_POLL_INTERVAL)
+                except queue.Empty:
+                    # a shard killed before it could send its sentinel (OOM, a crashing driver) is not waited on forever
+                    for shard_index, worker in enumerate(workers):
+                        if shard_index not in finished and worker.exitcode not in (None, 0):
+                            logger.info(f"shard {shard_index} died with exit code {worker.exitcode}")
+                            failures.append(shard_index)
+                            finished.add(shard_index)
+                    continue
+                if message is None:
+                    finished.add(shard_index)
+                elif isinstance(message, str):
+                    logger.info(f"shard {shard_index} failed: {message}")
+                    failures.append(shard_index)
+                elif message.type == Type.RECORD:
+                    message = emitter.emit(message.record.stream, message.record.data)
+                    if message is not None:
+                        yield message
+                elif message.type != Type.STATE:
+                    emitter.flush()
+                    yield message
+                elif message.state.stream.stream_descriptor.name == 'job_roles' and message.state.stream.stream_state:
+                    self.merge_sync_state(role_cursors, progress, message.state.stream.stream_state.dict())
+                    emitter.flush()
+                    yield self.state_message('job_roles', sync_state)
+        finally:
+            emitter.flush()
+            for worker in workers:
+                if worker.is_alive():
+                    worker.terminate()
+                worker.join()
+        if failures:
+            raise RuntimeError(f"shards {failures} of {shard_count} failed, their completed roles were checkpointed")
+
+        yield from self.final_state_messages(sync_state)
+
+
+def run_shard(config, state, messages):
+    """
+    Entry point of a local shard process: reads the shard and forwards every message to the parent as (shard_index,
+    message), then (shard_index, None) when done. A failure is forwarded as its formatted exception.
+    """
+    shard_index = config['shard_index']
+    try:
+        for message in SourceLinkedinJobScrapper().read(logger, config, None, state):
+            messages.put((shard_index, message))
+    except Exception as e:
+        messages.put((shard_index, repr(e)))
+    finally:
+        messages.put((shard_index, None))